@@ -1,15 +1,12 @@
 import argparse
 import os
 
+from functools import cache, lru_cache
 from sys import stderr
 from pathlib import Path
 from typing import Optional
 from codex.compiler.config import CompilerConfig, CompilerConfigError, validate_config
-from codex.parser import parse
 from codex.parser.errors import CodexSyntaxError
-from codex.parser.source import CodexSource
-from codex.compiler import Compiler
-from codex.compiler.targets import LANGUAGE_REGISTRY
 from codex.cli.formatting import (
     MODE_ERROR,
     MODE_WARNING,
@@ -21,12 +18,13 @@ from codex.cli.formatting import (
     red,
     yellow,
 )
-from dotenv import dotenv_values
 
 
+@cache
 def get_arg_parser() -> argparse.ArgumentParser:
     """
-    Return the argument parser for the CLI.
+    Return the argument parser for the CLI. The parser is only constructed once and reused
+    across calls.
     """
 
     parser = argparse.ArgumentParser(
@@ -63,6 +61,19 @@ def get_arg_parser() -> argparse.ArgumentParser:
         default=0.05,
     )
 
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always request new completions instead of reusing completions from previous compilations of identical prompts",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="The maximum number of code generation requests to run at once. Values greater than 1 generate all snippets concurrently, without previously generated code as context. (default: 1)",
+        default=1,
+    )
+
     parser.add_argument(
         "-v",
         "--verbose",
@@ -73,32 +84,101 @@ def get_arg_parser() -> argparse.ArgumentParser:
     return parser
 
 
+@lru_cache(maxsize=8)
+def _read_env_key(path: str, key: str, mtime_ns: Optional[int]) -> Optional[str]:
+    """
+    Return the value assigned to `key` in the given .env file, or `None` if the file does not
+    exist or does not define the key. The file is scanned line by line and the scan stops at
+    the first matching assignment.
+
+    Results are cached by path, key, and modification time, so repeated invocations within
+    a process only re-read the file if it has changed on disk.
+    """
+
+    if mtime_ns is None:
+        return None
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+
+            # ignore blank lines and comments
+            if not line or line.startswith("#"):
+                continue
+
+            if line.startswith("export "):
+                line = line[len("export ") :]
+
+            name, sep, value = line.partition("=")
+
+            if not sep or name.strip() != key:
+                continue
+
+            value = value.strip()
+
+            # take a quoted value up to its closing quote, ignoring anything after it
+            if value[:1] in ("\"", "'"):
+                closing_quote = value.find(value[0], 1)
+
+                if closing_quote != -1:
+                    return value[1:closing_quote]
+
+            # remove trailing inline comments
+            return value.split(" #", 1)[0].rstrip()
+
+    return None
+
+
 def args_as_compiler_config(args: argparse.Namespace) -> CompilerConfig:
     """
     Return a CompilerConfig object from the given arguments as parsed by the argument parser.
     """
 
-    env_config = dotenv_values(args.env)
+    try:
+        mtime_ns: Optional[int] = os.stat(args.env).st_mtime_ns
+    except FileNotFoundError:
+        mtime_ns = None
 
-    openai_key = env_config["OPENAI_KEY"]
+    # prefer the environment over the .env file
+    openai_key = os.environ.get("OPENAI_KEY") or _read_env_key(args.env, "OPENAI_KEY", mtime_ns)
 
     if not openai_key:
-        raise CompilerConfigError("OPENAI_KEY is not set in the .env file.")
-
-    output_path: str = args.output
-
-    if not args.output:
-        # if no output path is specified, use the name of the input file
-        output_path = Path(args.filename).name.split(".")[0]
+        raise CompilerConfigError("OPENAI_KEY is not set in the environment or the .env file.")
 
     return CompilerConfig(
         target_language_name=args.target,
         openai_key=openai_key,
         temperature=args.temperature,
         verbose=args.verbose,
+        use_cache=not args.no_cache,
+        concurrency=args.jobs,
     )
 
 
+def _resolve_output_path(args: argparse.Namespace, source_file_extension: str) -> str:
+    """
+    Return the path that the compiled program should be written to, given the arguments as
+    parsed by the argument parser and the source file extension of the target language.
+    """
+
+    # everything before the first dot, so that "my.prog.cdx" becomes "my"
+    input_stem = Path(args.filename).name.split(".")[0]
+
+    # if no output path is specified, use the name of the input file
+    output_path: str = args.output or input_stem
+
+    # if the output file is a directory, use the name of the input file
+    # appended to the directory, minus the extension
+    if os.path.isdir(output_path):
+        output_path = os.path.join(output_path, input_stem)
+
+    # if the output file lacks an extension, add the extension of the target language
+    if not Path(output_path).suffix:
+        output_path += "." + source_file_extension
+
+    return output_path
+
+
 def stderr_print(*args, **kwargs) -> None:
     """
     Print to stderr.
@@ -116,6 +196,8 @@ def run_cli() -> None:
     args = parser.parse_args()
 
     if args.list_languages:
+        from codex.compiler.targets import LANGUAGE_REGISTRY
+
         print()
         print(format_language_list(LANGUAGE_REGISTRY))
         print()
@@ -125,6 +207,12 @@ def run_cli() -> None:
         stderr_print(format_simple_error("No input file specified. Use -h for help."))
         return
 
+    # the compiler stack is imported lazily, since loading it is expensive and unnecessary
+    # for invocations that exit early
+    from codex.parser import parse
+    from codex.parser.source import CodexSource
+    from codex.compiler import Compiler
+
     try:
         config = args_as_compiler_config(args)
         validate_config(config)
@@ -135,35 +223,25 @@ def run_cli() -> None:
         compiler = Compiler(module, config)
         compiler.compile()
 
-        output_path = args.output
-
-        # if no output path is specified, use the name of the input file
-        if not output_path:
-            output_path = Path(args.filename).name.split(".")[0]
-
-        # if the output file is a directory, use the name of the input file
-        # appended to the directory, minus the extension
-        if os.path.isdir(output_path):
-            output_path = os.path.join(output_path, Path(args.filename).name.split(".")[0])
-
-        # if the output file lacks an extension, add the extension of the target language
-        if not Path(output_path).suffix:
-            output_path += "." + compiler.target.info.source_file_extension
+        output_path = _resolve_output_path(args, compiler.target.info.source_file_extension)
 
         with open(output_path, "w") as f:
-            f.write(compiler.get_output())
+            compiler.write_output(f)
+
+        errors = compiler.get_errors()
+        warnings = compiler.get_warnings()
 
-        for error in compiler.get_errors():
-            stderr_print(format_compileerror(error, MODE_ERROR))
-            stderr_print()
+        # format all diagnostics up front and write them to stderr at once
+        diagnostics: list[str] = []
+        diagnostics.extend(format_compileerror(e, MODE_ERROR) + "\n\n" for e in errors)
+        diagnostics.extend(format_compileerror(w, MODE_WARNING) + "\n\n" for w in warnings)
 
-        for warning in compiler.get_warnings():
-            stderr_print(format_compileerror(warning, MODE_WARNING))
-            stderr_print()
+        if diagnostics:
+            stderr.write("".join(diagnostics))
 
-        num_errs = len(compiler.get_errors())
+        num_errs = len(errors)
         emsg = red(str(num_errs) + " error" + ("s" if num_errs > 1 else ""))
-        num_warns = len(compiler.get_warnings())
+        num_warns = len(warnings)
         wmsg = yellow(str(num_warns) + " warning" + ("s" if num_warns > 1 else ""))
 
         if num_errs > 0 and num_warns == 0:
@@ -1,10 +1,23 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
 from colorama import Fore, Style
-from codex.compiler.compiler import CompilerError
 from codex.compiler.config import CompilerConfigError
-from codex.compiler.language_binding import LanguageBinding
 from codex.parser.errors import CodexSyntaxError
 from codex.parser.source import CodexSource
-from codex.util.strings import StringBuilder
+
+if TYPE_CHECKING:
+    # only needed for annotations; importing the compiler eagerly would load the tokenizer
+    from codex.compiler.compiler import CompilerError
+    from codex.compiler.targets import LanguageRegistration
+
+# ANSI escape sequences are constant, so the prefixes are computed once at import
+_RESET = Style.RESET_ALL
+_RED = Fore.RED + Style.BRIGHT
+_GREEN = Fore.GREEN + Style.BRIGHT
+_YELLOW = Fore.YELLOW + Style.BRIGHT
+_BLUE = Fore.BLUE + Style.BRIGHT
+_DIM = Style.DIM
+_BRIGHT = Style.BRIGHT
 
 
 def red(text: str) -> str:
@@ -12,7 +25,7 @@ def red(text: str) -> str:
     Return the given text in red.
     """
 
-    return f"{Fore.RED}{Style.BRIGHT}{text}{Style.RESET_ALL}"
+    return _RED + text + _RESET
 
 
 def green(text: str) -> str:
@@ -20,7 +33,7 @@ def green(text: str) -> str:
     Return the given text in green.
     """
 
-    return f"{Fore.GREEN}{Style.BRIGHT}{text}{Style.RESET_ALL}"
+    return _GREEN + text + _RESET
 
 
 def yellow(text: str) -> str:
@@ -28,7 +41,7 @@ def yellow(text: str) -> str:
     Return the given text in yellow.
     """
 
-    return f"{Fore.YELLOW}{Style.BRIGHT}{text}{Style.RESET_ALL}"
+    return _YELLOW + text + _RESET
 
 
 def blue(text: str) -> str:
@@ -36,7 +49,7 @@ def blue(text: str) -> str:
     Return the given text in blue.
     """
 
-    return f"{Fore.BLUE}{Style.BRIGHT}{text}{Style.RESET_ALL}"
+    return _BLUE + text + _RESET
 
 
 def dim(text: str) -> str:
@@ -44,7 +57,7 @@ def dim(text: str) -> str:
     Return the given text in dim.
     """
 
-    return f"{Style.DIM}{text}{Style.RESET_ALL}"
+    return _DIM + text + _RESET
 
 
 def format_compilerconfigerror(error: CompilerConfigError) -> str:
@@ -63,8 +76,11 @@ def format_simple_error(error: str) -> str:
     return f"{red('error:')} {error}"
 
 
+_PREVIEW_FORMAT = "%d| %s"
+
+
 def _get_source_preview(source: CodexSource, line_no: int) -> str:
-    return f"{dim(str(line_no)+ '| '+source.get_line_by_number(line_no))}"
+    return dim(_PREVIEW_FORMAT % (line_no, source.get_line_by_number(line_no)))
 
 
 def format_syntaxerror(error: CodexSyntaxError) -> str:
@@ -72,16 +88,15 @@ def format_syntaxerror(error: CodexSyntaxError) -> str:
     Format the given CodexSyntaxError as a colored string.
     """
 
-    s = StringBuilder()
-    s.writeln(f"at {blue(error.source.get_name())}, line {error.line_no}")
+    lines = [
+        f"at {blue(error.source.get_name())}, line {error.line_no}",
+        # preview the line where the error occurred
+        _get_source_preview(error.source, error.line_no),
+        "",
+        f"{red('syntax error:')} {error.message}",
+    ]
 
-    # preview the line where the error occurred
-    s.writeln(_get_source_preview(error.source, error.line_no))
-    s.writeln()
-
-    s.writeln(f"{red('syntax error:')} {error.message}")
-
-    return s.to_string(trim_trailing_whitespace=True)
+    return "\n".join(lines).rstrip()
 
 
 MODE_ERROR = 0
@@ -96,31 +111,30 @@ def format_compileerror(error: CompilerError, mode: int) -> str:
     source = error.offending_node.location.source
     line_no = error.offending_node.location.line_no
 
-    s = StringBuilder()
-    s.writeln(f"at {blue(source.get_name())}, line {line_no}")
-
-    # preview the line where the error occurred
-    s.writeln(_get_source_preview(source, line_no))
+    lines = [
+        f"at {blue(source.get_name())}, line {line_no}",
+        # preview the line where the error occurred
+        _get_source_preview(source, line_no),
+    ]
 
     if mode == MODE_ERROR:
-        s.writeln(f"{red('error:')} {error.message}")
+        lines.append(f"{red('error:')} {error.message}")
     elif mode == MODE_WARNING:
-        s.writeln(f"{yellow('warning:')} {error.message}")
+        lines.append(f"{yellow('warning:')} {error.message}")
 
-    return s.to_string(trim_trailing_whitespace=True)
+    return "\n".join(lines).rstrip()
 
 
-def format_language_list(languages: list[LanguageBinding]) -> str:
+def format_language_list(languages: list[LanguageRegistration]) -> str:
     """
     Format the given list of language names as a colored string.
     """
 
-    s = StringBuilder()
-    s.writeln(f"{Style.BRIGHT}Supported languages:{Style.RESET_ALL}")
+    lines = [_BRIGHT + "Supported languages:" + _RESET]
 
     for lang in languages:
-        s.writeln(f"  {blue(lang.name)} - {lang.info.display_name}")
-        s.writeln(f"    {dim(lang.info.description)}")
-        s.writeln()
+        lines.append(f"  {blue(lang.name)} - {lang.info.display_name}")
+        lines.append(f"    {dim(lang.info.description)}")
+        lines.append("")
 
-    return s.to_string(trim_trailing_whitespace=True)
+    return "\n".join(lines).rstrip()
@@ -1,2 +1,14 @@
 # re-export the compiler class
-from codex.compiler.compiler import Compiler
+#
+# The compiler module pulls in the OpenAI tokenizer, which is slow to load, so it is only
+# imported on first access. Submodules such as `codex.compiler.config` can then be imported
+# without loading the rest of the compiler.
+
+
+def __getattr__(name: str):
+    if name == "Compiler":
+        from codex.compiler.compiler import Compiler
+
+        return Compiler
+
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
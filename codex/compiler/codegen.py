@@ -4,7 +4,6 @@ from codex.compiler.language_binding import LanguageBinding
 from codex.lang.types import Type
 from codex.openai import DAVINCI_MAX_TOKENS
 from codex.openai.prompts import BasePrompt, CompletionPrompt, InsertionPrompt, count_tokens
-from codex.util.strings import StringBuilder
 
 GENERATED = "{{GENERATED}}"
 
@@ -79,29 +78,58 @@ class Codegen:
     token_limit: int
     _context: Optional[CodegenContext]
 
+    _lang_header: str
+    """
+    A comment containing the display name of the target language, prepended to every prompt.
+    """
+
+    _required_context: str
+    """
+    The language header followed by the required context of the current `CodegenContext`.
+    Recomputed by `set_context`.
+    """
+
+    _required_tokens: int
+    """
+    The number of tokens in `_required_context`.
+    """
+
+    _helpful_context: str
+    """
+    The helpful context of the current `CodegenContext`, with a trailing newline.
+    Recomputed by `set_context`.
+    """
+
     def __init__(self, language: LanguageBinding, prompt_token_limit: int) -> None:
         self.language = language
         self._context = None
         self.token_limit = prompt_token_limit
 
+        self._lang_header = language.generate_single_line_comment(language.info.display_name)
+        self._required_context = ""
+        self._required_tokens = 0
+        self._helpful_context = ""
+
     def set_context(self, context: CodegenContext) -> None:
         self._context = context
 
+        # prepend the language name to the required context
+        self._required_context = (
+            ensure_trailing_newline(self._lang_header)
+            + "\n"
+            + ensure_trailing_newline(context.required_context)
+        )
+        self._required_tokens = count_tokens(self._required_context)
+        self._helpful_context = ensure_trailing_newline(context.helpful_context)
+
     def build_contextualized_prompt(self, prompt: BasePrompt) -> BasePrompt:
         if not self._context:
             return prompt
 
-        # prepend the language name to the required context
-        lang_header = self.language.generate_single_line_comment(self.language.info.display_name)
-        required_context = (
-            ensure_trailing_newline(lang_header)
-            + "\n"
-            + ensure_trailing_newline(self._context.required_context)
-        )
+        required_context = self._required_context
 
         # see how many tokens we have left to work with
-        required_tokens = count_tokens(required_context)
-        tokens_left = self.token_limit - required_tokens
+        tokens_left = self.token_limit - self._required_tokens
 
         if tokens_left <= 0:
             raise ValueError("The required context provided is too long.")
@@ -112,9 +140,7 @@ class Codegen:
 
         if isinstance(prompt, CompletionPrompt):
             new_prompt = prompt.clone()
-            new_prompt.prompt = (
-                ensure_trailing_newline(self._context.helpful_context) + prompt.prompt
-            )
+            new_prompt.prompt = self._helpful_context + prompt.prompt
             new_prompt.truncate_prompt(tokens_left)
             new_prompt.prompt = required_context + new_prompt.prompt
 
@@ -122,9 +148,7 @@ class Codegen:
 
         if isinstance(prompt, InsertionPrompt):
             new_prompt = prompt.clone()
-            new_prompt.prefix = (
-                ensure_trailing_newline(self._context.helpful_context) + prompt.prefix
-            )
+            new_prompt.prefix = self._helpful_context + prompt.prefix
             new_prompt.truncate_prompt(tokens_left)
             new_prompt.prefix = required_context + new_prompt.prefix
 
@@ -141,18 +165,16 @@ class Codegen:
         ```
         """
 
-        prompt = CompletionPrompt(
-            prompt=self.language.generate_single_line_comment(action_prompt) + "\n"
-        )
+        comment = self.language.generate_single_line_comment(action_prompt)
+
+        prompt = CompletionPrompt(prompt=comment + "\n")
         prompt.set_stop_sequences(["\n\n"])
 
-        template = StringBuilder()
-        template.writeln(self.language.generate_single_line_comment(action_prompt))
-        template.writeln(GENERATED)
+        template = "\n".join([comment, GENERATED, ""])
 
         return SnippetBlueprint(
             codex_prompt=self.build_contextualized_prompt(prompt),
-            generation_template=template.to_string(),
+            generation_template=template,
         )
 
     def generate_variable_decl(
@@ -180,15 +202,19 @@ class Codegen:
 
         # construct template
 
-        template = StringBuilder()
-        # add original prompt as a comment
-        template.writeln(self.language.generate_single_line_comment(variable_prompt))
-        # add variable declaration
-        template.writeln(self.language.generate_variable_assignment(name, type, GENERATED))
+        template = "\n".join(
+            [
+                # add original prompt as a comment
+                variable_description,
+                # add variable declaration
+                self.language.generate_variable_assignment(name, type, GENERATED),
+                "",
+            ]
+        )
 
         return SnippetBlueprint(
             codex_prompt=self.build_contextualized_prompt(prompt),
-            generation_template=template.to_string(),
+            generation_template=template,
         )
 
     def generate_prompted_function_decl(
@@ -213,14 +239,16 @@ class Codegen:
         )
         prompt.set_stop_sequences(["\n\n"])
 
-        template = StringBuilder()
-        template.writeln(
-            self.language.generate_function_declaration(
-                function_name, return_type, arguments, GENERATED
-            )
+        template = "\n".join(
+            [
+                self.language.generate_function_declaration(
+                    function_name, return_type, arguments, GENERATED
+                ),
+                "",
+            ]
         )
 
         return SnippetBlueprint(
             codex_prompt=self.build_contextualized_prompt(prompt),
-            generation_template=template.to_string(),
+            generation_template=template,
         )
@@ -1,5 +1,8 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TextIO
 import re
+import sqlite3
+from sys import stderr
 from codex.lang.types import BASE_TYPES, Type
 
 from codex.parser.ast import (
@@ -13,7 +16,9 @@ from codex.parser.ast import (
 )
 from codex.util.strings import StringBuilder
 
-from codex.openai import OpenAI, DAVINCI_MAX_TOKENS
+from codex.openai import OpenAI, DAVINCI_MAX_TOKENS, MAX_BATCH_SIZE
+from codex.openai.cache import CompletionCache
+from codex.openai.prompts import CompletionPrompt
 
 from codex.lang.std import StandardModule, get_standard_module, get_all_standard_modules
 
@@ -23,6 +28,9 @@ from codex.compiler.config import CompilerConfig
 from codex.compiler.codegen import GENERATED, Codegen, SnippetBlueprint, CodegenContext
 
 
+_BASE_TYPES_BY_NAME: dict[str, Type] = {base_type.name: base_type for base_type in BASE_TYPES}
+
+
 class CompilerError(Exception):
     offending_node: ASTNode
     message: str
@@ -56,6 +64,12 @@ class Compiler:
     The OpenAI API wrapper, used for code generation.
     """
 
+    _cache: Optional[CompletionCache]
+    """
+    The persistent completion cache, or `None` if caching is disabled or the cache could not
+    be opened. Closed once compilation finishes.
+    """
+
     _codegen: Codegen
     """
     The helper class used for generating code snippets.
@@ -67,13 +81,65 @@ class Compiler:
     _errors: list[CompilerError]
     _warnings: list[CompilerError]
 
+    _pending_snippets: list[SnippetBlueprint]
+    """
+    Snippets waiting to be generated concurrently. Only used if `config.concurrency` is
+    greater than 1.
+    """
+
+    _generations: dict[tuple[tuple, float], str]
+    """
+    Code previously generated during this compilation, keyed by the content of the prompt
+    and the temperature, so that identical prompts only result in a single API request.
+    """
+
     _used_modules: set[StandardModule]
 
+    _default_modules: tuple[StandardModule, ...]
+    """
+    Standard modules that are included by default.
+    """
+
+    _optional_modules: tuple[StandardModule, ...]
+    """
+    Standard modules that must be included explicitly using the `using` directive.
+    """
+
+    _unused_optional_modules: set[StandardModule]
+    """
+    Optional standard modules that have not been included yet.
+    """
+
+    _warned_modules: set[StandardModule]
+    """
+    Modules that a warning has already been added for because a prompt mentioned them without
+    them being included. Each module is only warned about once per compilation.
+    """
+
+    _keyword_to_module: dict[str, StandardModule]
+    """
+    Maps the lowercased keywords of each standard module that is not included by default to
+    that module.
+    """
+
+    _keywords_pattern: Optional[re.Pattern]
+    """
+    A single precompiled pattern matching any keyword in `_keyword_to_module`, used to check
+    prompts for modules that have not been included. Matches case-insensitively. `None` if
+    there are no such keywords.
+    """
+
     _custom_types: dict[str, Type]
     """
     Registry of user-defined types or types included from standard modules.
     """
 
+    _node_handlers: dict[type[ASTNode], Callable[[Any], None]]
+    """
+    Maps each type of top-level AST node to the method that compiles it. Prompt nodes are
+    checked for mentions of modules that have not been included before being compiled.
+    """
+
     def __init__(self, module: Module, config: CompilerConfig) -> None:
         """
         This constructor does not validate the given module or configuration. The configuration
@@ -84,7 +150,8 @@ class Compiler:
         self.config = config
         self.target = get_language_binding(config.target_language_name)
 
-        self._openai = OpenAI(config.openai_key)
+        self._cache = self._open_cache() if config.use_cache else None
+        self._openai = OpenAI(config.openai_key, cache=self._cache)
         self._codegen = Codegen(self.target, prompt_token_limit=DAVINCI_MAX_TOKENS)
 
         self._header = StringBuilder()
@@ -93,21 +160,192 @@ class Compiler:
         self._errors = []
         self._warnings = []
 
+        self._pending_snippets = []
+        self._generations = {}
+
         self._used_modules = set()
 
+        all_modules = get_all_standard_modules()
+        self._default_modules = tuple(m for m in all_modules if m.include_by_default)
+        self._optional_modules = tuple(m for m in all_modules if not m.include_by_default)
+        self._unused_optional_modules = set(self._optional_modules)
+        self._warned_modules = set()
+
+        self._keyword_to_module = {}
+
+        for module in self._optional_modules:
+            for keyword in module.lowercase_keywords:
+                self._keyword_to_module.setdefault(keyword, module)
+
+        # longer keywords are tried first, so that e.g. "2d array" is preferred over "array"
+        keywords = sorted(self._keyword_to_module, key=len, reverse=True)
+        self._keywords_pattern = (
+            re.compile(
+                r"\b(" + "|".join(re.escape(keyword) for keyword in keywords) + r")\b",
+                re.IGNORECASE,
+            )
+            if keywords
+            else None
+        )
+
         self._custom_types = {}
 
+        self._node_handlers = {
+            UsingDirectiveNode: self._compile_using_directive,
+            ActionStatementNode: self._with_prompt_check(self._compile_action_statement),
+            VariableDeclarationNode: self._with_prompt_check(self._compile_variable_declaration),
+            PromptedFunctionDeclarationNode: self._with_prompt_check(
+                self._compile_prompted_function
+            ),
+        }
+
+    def _open_cache(self) -> Optional[CompletionCache]:
+        """
+        Open the completion cache, or return `None` if it cannot be opened, e.g. because the
+        cache directory is not writable. Compilation then proceeds without a cache.
+        """
+
+        try:
+            return CompletionCache()
+        except (OSError, sqlite3.Error) as e:
+            if self.config.verbose:
+                print(f"warning: completion cache disabled: {e}", file=stderr)
+
+            return None
+
+    def _with_prompt_check(
+        self, compile_node: Callable[[Any], None]
+    ) -> Callable[[PromptNode], None]:
+        """
+        Wrap the given node compiler so that the prompt of each node is first checked for
+        mentions of modules that have not been included.
+        """
+
+        def handler(node: PromptNode) -> None:
+            self._check_prompt_for_unincluded_modules(node)
+            compile_node(node)
+
+        return handler
+
+    def _get_generation_key(self, snippet_generator: SnippetBlueprint) -> tuple[tuple, float]:
+        """
+        Return the key under which code generated for the given snippet is stored in
+        `_generations`.
+        """
+
+        return (snippet_generator.codex_prompt.get_key(), self.config.temperature)
+
     def _generate_snippet(self, snippet_generator: SnippetBlueprint) -> str:
         """
         Given a snippet generator, generate a code snippet using the OpenAI Codex API.
         """
 
-        generation = self._openai.generate_code(
-            snippet_generator.codex_prompt, self.config.temperature, 150
-        )
+        key = self._get_generation_key(snippet_generator)
+        generation = self._generations.get(key)
+
+        if generation is None:
+            generation = self._openai.generate_code(
+                snippet_generator.codex_prompt, self.config.temperature, 150
+            )
+            self._generations[key] = generation
 
         return snippet_generator.generation_template.replace(GENERATED, generation)
 
+    def _generate_snippet_batch(self, snippet_generators: list[SnippetBlueprint]) -> list[str]:
+        """
+        Generate code snippets for snippet generators whose prompts are all completion prompts
+        with the same stop sequences, using a single request to the OpenAI Codex API.
+        """
+
+        prompts: list[CompletionPrompt] = []
+
+        for snippet_generator in snippet_generators:
+            assert isinstance(snippet_generator.codex_prompt, CompletionPrompt)
+            prompts.append(snippet_generator.codex_prompt)
+
+        generations = self._openai.generate_code_batch(prompts, self.config.temperature, 150)
+
+        for snippet_generator, generation in zip(snippet_generators, generations):
+            self._generations[self._get_generation_key(snippet_generator)] = generation
+
+        return [
+            snippet_generator.generation_template.replace(GENERATED, generation)
+            for snippet_generator, generation in zip(snippet_generators, generations)
+        ]
+
+    def _emit_snippet(self, snippet_generator: SnippetBlueprint) -> None:
+        """
+        Generate the given snippet and add it to the program.
+
+        If concurrent generation is enabled, the snippet is instead queued and generated
+        along with every other queued snippet at the end of compilation, in which case
+        the prompt will not include code generated for previous statements.
+        """
+
+        if self.config.concurrency > 1:
+            self._pending_snippets.append(snippet_generator)
+            return
+
+        self._program.writeln(self._generate_snippet(snippet_generator))
+
+    def _flush_pending_snippets(self) -> None:
+        """
+        Generate all queued snippets concurrently, running at most `config.concurrency` API
+        requests at a time, and add them to the program in order.
+
+        Each queued snippet's prompt was built with the context available when its node was
+        compiled, i.e. the program header at that point, but no generated code.
+        """
+
+        if not self._pending_snippets:
+            return
+
+        pending = self._pending_snippets
+        self._pending_snippets = []
+
+        # completion prompts that share stop sequences can be sent together in a single
+        # request; insertion prompts each have their own suffix and must be sent separately
+        batches: dict[tuple[str, ...], list[int]] = {}
+        requests: list[list[int]] = []
+
+        # identical prompts are only requested once, and prompts that code has already been
+        # generated for are not requested at all; see `_generations`
+        keys = [self._get_generation_key(snippet_generator) for snippet_generator in pending]
+        requested_keys = set(self._generations)
+
+        for i, snippet_generator in enumerate(pending):
+            if keys[i] in requested_keys:
+                continue
+
+            requested_keys.add(keys[i])
+            prompt = snippet_generator.codex_prompt
+
+            if isinstance(prompt, CompletionPrompt):
+                batches.setdefault(tuple(prompt.stop_sequences), []).append(i)
+            else:
+                requests.append([i])
+
+        for indices in batches.values():
+            for start in range(0, len(indices), MAX_BATCH_SIZE):
+                requests.append(indices[start : start + MAX_BATCH_SIZE])
+
+        def run_request(indices: list[int]) -> list[str]:
+            if len(indices) == 1:
+                return [self._generate_snippet(pending[indices[0]])]
+
+            return self._generate_snippet_batch([pending[i] for i in indices])
+
+        # every request stores its generations in `_generations`, from which the snippets are
+        # then built, so that duplicate prompts receive the same code
+        with ThreadPoolExecutor(max_workers=self.config.concurrency) as executor:
+            for _ in executor.map(run_request, requests):
+                pass
+
+        for snippet_generator, key in zip(pending, keys):
+            self._program.writeln(
+                snippet_generator.generation_template.replace(GENERATED, self._generations[key])
+            )
+
     def _compile_using_directive(self, node: UsingDirectiveNode) -> None:
         module = get_standard_module(node.module_name)
 
@@ -149,6 +387,7 @@ class Compiler:
         """
 
         self._used_modules.add(module)
+        self._unused_optional_modules.discard(module)
 
         # get language-specific bindings for the module
         binding = self.target.stdlib_binding.get_module_binding(module)
@@ -189,9 +428,8 @@ class Compiler:
             raise ValueError(f"Type '{type.name}' is already registered")
 
         # make sure type does not conflict with a base type
-        for base_type in BASE_TYPES:
-            if type.name == base_type.name:
-                raise ValueError(f"Type '{type.name}' conflicts with a base type of the same name")
+        if type.name in _BASE_TYPES_BY_NAME:
+            raise ValueError(f"Type '{type.name}' conflicts with a base type of the same name")
 
         self._custom_types[type.name] = type
 
@@ -202,19 +440,15 @@ class Compiler:
         Return None if the type expression is invalid or no corresponding type exists.
         """
 
-        for base_type in BASE_TYPES:
-            if type_name == base_type.name:
-                return base_type
-
-        if type_name in self._custom_types:
-            return self._custom_types[type_name]
+        if type_name in _BASE_TYPES_BY_NAME:
+            return _BASE_TYPES_BY_NAME[type_name]
 
-        return None
+        return self._custom_types.get(type_name)
 
     def _compile_action_statement(self, node: ActionStatementNode) -> None:
         self._set_codegen_context()
         snippet = self._codegen.generate_action(node.prompt.prompt)
-        self._program.writeln(self._generate_snippet(snippet))
+        self._emit_snippet(snippet)
 
     def _compile_variable_declaration(self, node: VariableDeclarationNode) -> None:
         if node.type:
@@ -232,7 +466,7 @@ class Compiler:
             type=type,
             variable_prompt=node.prompt.prompt,
         )
-        self._program.writeln(self._generate_snippet(snippet))
+        self._emit_snippet(snippet)
 
     def _compile_prompted_function(self, node: PromptedFunctionDeclarationNode) -> None:
         self._set_codegen_context()
@@ -262,32 +496,37 @@ class Compiler:
             arguments=arguments,
             implementation_prompt=node.prompt.prompt,
         )
-        self._program.writeln(self._generate_snippet(snippet))
+        self._emit_snippet(snippet)
 
     def _check_prompt_for_unincluded_modules(self, node: PromptNode) -> None:
         """
         Check the prompt for keywords that correspond to modules that have not been included
-        using the `using` directive. If any are found, add a warning.
+        using the `using` directive. If any are found, add a warning, unless one has already
+        been added for the same module.
         """
 
-        prompt_text = node.prompt.prompt
+        # nothing to warn about if every optional module has been included or warned about
+        if self._keywords_pattern is None or self._unused_optional_modules <= self._warned_modules:
+            return
+
+        for match in self._keywords_pattern.finditer(node.prompt.prompt):
+            keyword = match.group(1).lower()
+            module = self._keyword_to_module[keyword]
 
-        for module in get_all_standard_modules():
-            if module.include_by_default:
+            if module not in self._unused_optional_modules:
                 continue
 
-            if module in self._used_modules:
+            # don't add multiple warnings for the same module
+            if module in self._warned_modules:
                 continue
 
-            for keyword in module.keywords:
-                if re.findall(r"\b" + keyword.lower() + r"\b", prompt_text.lower()):
-                    self._warnings.append(
-                        CompilerError(
-                            f'Prompt mentions "{keyword}", but the {module.name} module was not included. Consider adding "using {module.name}" to the top of your file.',
-                            node,
-                        )
-                    )
-                    break  # don't add multiple warnings for the same module
+            self._warned_modules.add(module)
+            self._warnings.append(
+                CompilerError(
+                    f'Prompt mentions "{keyword}", but the {module.name} module was not included. Consider adding "using {module.name}" to the top of your file.',
+                    node,
+                )
+            )
 
     def compile(self) -> None:
         """
@@ -297,29 +536,26 @@ class Compiler:
         This method should only be called once per Compiler instance.
         """
 
-        # include modules that are included by default
-        for module in get_all_standard_modules():
-            if module.include_by_default:
+        try:
+            # include modules that are included by default
+            for module in self._default_modules:
                 self._include_module(module)
 
-        for node in self.module.children:
-            if isinstance(node, UsingDirectiveNode):
-                self._compile_using_directive(node)
-            elif isinstance(node, ActionStatementNode):
-                self._check_prompt_for_unincluded_modules(node)
-
-                self._compile_action_statement(node)
-            elif isinstance(node, VariableDeclarationNode):
-                self._check_prompt_for_unincluded_modules(node)
+            for node in self.module.children:
+                handler = self._node_handlers.get(type(node))
 
-                self._compile_variable_declaration(node)
-            elif isinstance(node, PromptedFunctionDeclarationNode):
-                self._check_prompt_for_unincluded_modules(node)
+                if handler is None:
+                    raise NotImplementedError(
+                        f"Cannot compile node of type {type(node).__name__}"
+                    )
 
-                self._compile_prompted_function(node)
+                handler(node)
 
-            else:
-                raise NotImplementedError(f"Cannot compile node of type {type(node).__name__}")
+            self._flush_pending_snippets()
+        finally:
+            # all code is generated during compilation, so the cache is no longer needed
+            if self._cache is not None:
+                self._cache.close()
 
     def get_errors(self) -> list[CompilerError]:
         return self._errors[:]  # copy to prevent mutation
@@ -328,4 +564,16 @@ class Compiler:
         return self._warnings[:]  # copy to prevent mutation
 
     def get_output(self) -> str:
-        return self._header.to_string() + "\n\n" + self._program.to_string()
+        # join in one pass instead of building an intermediate header + separator string
+        return "".join((self._header.to_string(), "\n\n", self._program.to_string()))
+
+    def write_output(self, file: TextIO) -> None:
+        """
+        Write the compiled program to the given file. Equivalent to writing the result of
+        `get_output()`, but the header and program are written separately instead of being
+        concatenated in memory first.
+        """
+
+        file.write(self._header.to_string())
+        file.write("\n\n")
+        file.write(self._program.to_string())
@@ -1,5 +1,5 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from codex.compiler.targets import is_language_supported
 
 
@@ -12,16 +12,18 @@ class CompilerConfigError(Exception):
         super().__init__(message)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CompilerConfig:
     target_language_name: str
     """
     See codex.compiler.languages for a list of supported languages.
     """
 
-    openai_key: str
+    openai_key: str = field(repr=False)
     """
     See https://beta.openai.com/docs/api-reference/authentication for more information.
+
+    Excluded from the representation of the configuration so that it is not leaked into logs.
     """
 
     temperature: float = 0.05
@@ -34,6 +36,19 @@ class CompilerConfig:
     Whether to print verbose output.
     """
 
+    use_cache: bool = True
+    """
+    Whether to reuse completions from previous compilations for identical prompts. See
+    `codex.openai.cache` for more information.
+    """
+
+    concurrency: int = 1
+    """
+    Maximum number of code generation requests to run at once. If greater than 1, all snippets
+    are generated concurrently once the module has been processed, which means that prompts
+    do not include code generated for previous statements.
+    """
+
 
 def validate_config(config: CompilerConfig) -> None:
     """
@@ -54,3 +69,7 @@ def validate_config(config: CompilerConfig) -> None:
     # verify that temperature is valid
     if config.temperature < 0.0 or config.temperature > 1.0:
         raise CompilerConfigError("Temperature must be between 0.0 and 1.0")
+
+    # verify that concurrency is valid
+    if config.concurrency < 1:
+        raise CompilerConfigError("Concurrency must be at least 1")
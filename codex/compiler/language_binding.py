@@ -4,7 +4,7 @@ from codex.lang.types import Type
 from codex.lang.std import StandardModule
 
 
-@dataclass
+@dataclass(slots=True)
 class LanguageInfo:
     """
     Represents metadata for a language.
@@ -16,6 +16,8 @@ class LanguageInfo:
 
 
 class ModuleBinding:
+    __slots__ = ("module", "analogous_module", "polyfill", "type_bindings")
+
     module: StandardModule
 
     analogous_module: Optional[str]
@@ -59,6 +61,8 @@ class StandardLibraryBinding:
     imports.
     """
 
+    __slots__ = ("_module_bindings", "_unsupported_modules")
+
     _module_bindings: dict[StandardModule, ModuleBinding]
     _unsupported_modules: set[StandardModule]
 
@@ -104,6 +108,8 @@ class LanguageBinding:
     Represents functionality for generating language-specific code.
     """
 
+    __slots__ = ("name", "info", "stdlib_binding")
+
     name: str
     info: LanguageInfo
     stdlib_binding: StandardLibraryBinding
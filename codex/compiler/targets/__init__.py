@@ -1,22 +1,79 @@
-from codex.compiler.language_binding import LanguageBinding
-from codex.compiler.targets.python import PythonLanguageBinding
+from importlib import import_module
+from typing import Optional
+from codex.compiler.language_binding import LanguageBinding, LanguageInfo
 
-LANGUAGE_REGISTRY: list[LanguageBinding] = [
-    PythonLanguageBinding(),
+
+class LanguageRegistration:
+    """
+    Lightweight registry entry for a target language.
+
+    Holds only the metadata needed to list and validate languages. The module implementing the
+    language binding is not imported until the binding is first requested via `load`.
+    """
+
+    name: str
+    info: LanguageInfo
+
+    binding_path: str
+    """
+    Location of the `LanguageBinding` subclass, in the form `package.module:ClassName`.
+    """
+
+    _binding: Optional[LanguageBinding]
+
+    def __init__(self, name: str, info: LanguageInfo, binding_path: str) -> None:
+        self.name = name
+        self.info = info
+        self.binding_path = binding_path
+        self._binding = None
+
+    def load(self) -> LanguageBinding:
+        """
+        Import and instantiate the language binding, or return the cached instance if it has
+        already been loaded.
+        """
+
+        if self._binding is None:
+            module_name, class_name = self.binding_path.split(":")
+            binding_class = getattr(import_module(module_name), class_name)
+            self._binding = binding_class(self.info)
+
+        return self._binding
+
+
+LANGUAGE_REGISTRY: list[LanguageRegistration] = [
+    LanguageRegistration(
+        "python3",
+        LanguageInfo(
+            display_name="Python 3",
+            source_file_extension="py",
+            description="A popular, high-level, general-purpose programming language. OpenAI's Codex model is most capable with generating Python, and Python is the recommended language for most use cases.",
+        ),
+        binding_path="codex.compiler.targets.python:PythonLanguageBinding",
+    ),
 ]
 
 
+_REGISTRY_BY_NAME: dict[str, LanguageRegistration] = {
+    language.name.lower(): language for language in LANGUAGE_REGISTRY
+}
+"""
+Registry entries keyed by lowercased language name, for case-insensitive lookup.
+"""
+
+
 def get_language_binding(language_name: str) -> LanguageBinding:
     """
     Get a language binding by name (case-insensitive).
     If no language binding is found, a ValueError is raised.
     """
 
-    for language in LANGUAGE_REGISTRY:
-        if language.name.lower() == language_name.lower():
-            return language
+    language = _REGISTRY_BY_NAME.get(language_name.lower())
 
-    raise ValueError(f"Language {language_name} is not supported")
+    if language is None:
+        raise ValueError(f"Language {language_name} is not supported")
+
+    return language.load()
 
 
 def is_language_supported(language_name: str) -> bool:
@@ -25,8 +82,4 @@ def is_language_supported(language_name: str) -> bool:
     (case-insensitive).
     """
 
-    for language in LANGUAGE_REGISTRY:
-        if language.name.lower() == language_name.lower():
-            return True
-
-    return False
+    return language_name.lower() in _REGISTRY_BY_NAME
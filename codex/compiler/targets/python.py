@@ -9,12 +9,6 @@ from codex.lang.std import StandardLibrary, StdLibTypes
 from codex.lang.types import Type
 from codex.util.strings import indented
 
-info = LanguageInfo(
-    display_name="Python 3",
-    source_file_extension="py",
-    description="A popular, high-level, general-purpose programming language. OpenAI's Codex model is most capable with generating Python, and Python is the recommended language for most use cases.",
-)
-
 stdlib_binding = (
     StandardLibraryBinding()
     .add_module_binding(ModuleBinding(StandardLibrary.Math, analogous_module="math"))
@@ -31,7 +25,9 @@ stdlib_binding = (
 
 
 class PythonLanguageBinding(LanguageBinding):
-    def __init__(self) -> None:
+    __slots__ = ()
+
+    def __init__(self, info: LanguageInfo) -> None:
         super().__init__(
             name="python3",
             info=info,
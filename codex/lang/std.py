@@ -3,6 +3,15 @@ from codex.lang.types import Type
 
 
 class StandardModule:
+    __slots__ = (
+        "name",
+        "description",
+        "keywords",
+        "lowercase_keywords",
+        "include_by_default",
+        "module_types",
+    )
+
     name: str
     """
     Module name as it appears under the `using` directive.
@@ -19,6 +28,11 @@ class StandardModule:
     these keywords are used in the code. Case-insensitive.
     """
 
+    lowercase_keywords: tuple[str, ...]
+    """
+    `keywords`, converted to lowercase once at construction for case-insensitive matching.
+    """
+
     include_by_default: bool
     """
     If `True`, then this module is included by default. If `False`, then the user must explicitly
@@ -32,15 +46,16 @@ class StandardModule:
         name: str,
         *args,
         description: str,
-        keywords: list[str] = [],
+        keywords: Optional[list[str]] = None,
         include_by_default: bool = False,
-        module_types: list[Type] = [],
+        module_types: Optional[list[Type]] = None,
     ) -> None:
         self.name = name
         self.description = description
-        self.keywords = keywords
+        self.keywords = keywords or []
+        self.lowercase_keywords = tuple(keyword.lower() for keyword in self.keywords)
         self.include_by_default = include_by_default
-        self.module_types = module_types
+        self.module_types = module_types or []
 
     def __hash__(self) -> int:
         """
@@ -100,16 +115,22 @@ class StandardLibrary:
     )
 
 
+_MODULES_BY_NAME: dict[str, StandardModule] = {
+    module.name: module
+    for module in StandardLibrary.__dict__.values()
+    if isinstance(module, StandardModule)
+}
+"""
+All modules in `StandardLibrary`, keyed by name.
+"""
+
+
 def get_standard_module(name: str) -> Optional[StandardModule]:
     """
     Search `StandardLibrary` for a module with the given name. If none is found, return `None`.
     """
 
-    for module in StandardLibrary.__dict__.values():
-        if isinstance(module, StandardModule) and module.name == name:
-            return module
-
-    return None
+    return _MODULES_BY_NAME.get(name)
 
 
 def get_all_standard_modules() -> list[StandardModule]:
@@ -117,6 +138,4 @@ def get_all_standard_modules() -> list[StandardModule]:
     Return a list of all standard modules.
     """
 
-    return [
-        module for module in StandardLibrary.__dict__.values() if isinstance(module, StandardModule)
-    ]
+    return list(_MODULES_BY_NAME.values())
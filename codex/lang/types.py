@@ -1,9 +1,10 @@
 from __future__ import annotations
-from random import randint
+from itertools import count
 
-
-def _generate_id() -> int:
-    return randint(0, 1000000)
+_generate_id = count().__next__
+"""
+Return a new type ID. IDs are sequential, so no two types share an ID.
+"""
 
 
 class Type:
@@ -22,7 +23,8 @@ class Type:
         return self._id
 
     def __eq__(self, other: Type) -> bool:
-        return self._id == other._id
+        # types are shared by reference, so most comparisons are between the same instance
+        return self is other or self._id == other._id
 
     def __hash__(self) -> int:
         return self._id
@@ -1,22 +1,100 @@
+from typing import Any, Optional
+from codex.openai.cache import CompletionCache
 from codex.openai.interface import APIInterface
 from codex.openai.prompts import InsertionPrompt, CompletionPrompt, BasePrompt
 
 CODEX_MODEL = "code-davinci-002"
 API_BASE = "https://api.openai.com/v1/"
 DAVINCI_MAX_TOKENS = 4000
+MAX_BATCH_SIZE = 20
+"""
+The maximum number of prompts to send in a single request to the completions endpoint.
+"""
 
 
 class OpenAICodexError(Exception):
     pass
 
 
+_API_INTERFACES: dict[str, APIInterface] = {}
+"""
+API interfaces shared between `OpenAI` instances, keyed by API key, so that connections are
+reused across compilations within the same process.
+"""
+
+
+def _get_api_interface(api_key: str) -> APIInterface:
+    if api_key not in _API_INTERFACES:
+        _API_INTERFACES[api_key] = APIInterface(
+            base_url=API_BASE, authorization_header="Bearer " + api_key
+        )
+
+    return _API_INTERFACES[api_key]
+
+
+def _get_max_tokens(prompt: BasePrompt, target_max_tokens: int) -> int:
+    """
+    Return the `max_tokens` value to pass to the API for the given prompt. See
+    `OpenAI.generate_code` for the meaning of `target_max_tokens`.
+
+    If the size of the prompt exceeds the maximum number of tokens allowed by the model,
+    raise a `ValueError`.
+    """
+
+    prompt_tokens = prompt.get_token_count()
+
+    if prompt_tokens > DAVINCI_MAX_TOKENS:
+        raise ValueError(
+            f"The provided prompt is too long ({prompt_tokens}/{DAVINCI_MAX_TOKENS} tokens)."
+        )
+
+    # determine the maximum number of tokens left for output, since the model input and
+    # output combined cannot exceed a fixed number of tokens
+    tokens_left = DAVINCI_MAX_TOKENS - prompt_tokens
+
+    # determine the max_tokens value to pass to the API; given as the smaller between
+    # tokens_left and max_tokens unless max_tokens is NO_MAX_TOKENS
+    if target_max_tokens == 0:
+        return tokens_left
+
+    return min(tokens_left, target_max_tokens)
+
+
 class OpenAI:
     api_key: str
     _api: APIInterface
 
-    def __init__(self, api_key: str) -> None:
+    _cache: Optional[CompletionCache]
+    """
+    Cache of previously generated completions. If `None`, every request is sent to the API.
+    """
+
+    def __init__(self, api_key: str, cache: Optional[CompletionCache] = None) -> None:
         self.api_key = api_key
-        self._api = APIInterface(base_url=API_BASE, authorization_header="Bearer " + api_key)
+        self._api = _get_api_interface(api_key)
+        self._cache = cache
+
+    def _build_request(
+        self, prompt: BasePrompt, temperature: float, target_max_tokens: int
+    ) -> dict[str, Any]:
+        """
+        Return the body of a completion request for the given prompt.
+        """
+
+        data = {
+            "model": CODEX_MODEL,
+            "max_tokens": _get_max_tokens(prompt, target_max_tokens),
+            "temperature": temperature,
+            "stop": prompt.stop_sequences or None,
+        }
+
+        if isinstance(prompt, InsertionPrompt):
+            data["prompt"] = prompt.prefix
+            data["suffix"] = prompt.suffix
+        elif isinstance(prompt, CompletionPrompt):
+            data["prompt"] = prompt.prompt
+
+        return data
 
     def generate_code(self, prompt: BasePrompt, temperature: float, target_max_tokens: int) -> str:
         """
@@ -31,44 +109,90 @@ class OpenAI:
         more random output, while lower values will result in more predictable output. For
         Codex, the recommended range is 0.0 to 0.2.
 
+        If a cache was provided and an identical request has been made before, the cached
+        completion is returned without contacting the API.
+
         Raise an `OpenAICodexError` if the API returns an error.
 
         If the size of the prompt exceeds the maximum number of tokens allowed by the model,
         raise a `ValueError`.
         """
 
-        if prompt.get_token_count() > DAVINCI_MAX_TOKENS:
-            raise ValueError(
-                f"The provided prompt is too long ({prompt.get_token_count()}/{DAVINCI_MAX_TOKENS} tokens)."
-            )
-
-        # determine the maximum number of tokens left for output, since the model input and
-        # output combined cannot exceed a fixed number of tokens
-        tokens_left = DAVINCI_MAX_TOKENS - prompt.get_token_count()
-
-        # determine the max_tokens value to pass to the API; given as the smaller between
-        # tokens_left and max_tokens unless max_tokens is NO_MAX_TOKENS
-        if target_max_tokens == 0:
-            max_tokens = tokens_left
-        else:
-            max_tokens = min(tokens_left, target_max_tokens)
+        data = self._build_request(prompt, temperature, target_max_tokens)
 
-        data = {
-            "model": CODEX_MODEL,
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "stop": prompt.stop_sequences or None,
-        }
-
-        if isinstance(prompt, InsertionPrompt):
-            data["prompt"] = prompt.prefix
-            data["suffix"] = prompt.suffix
-        elif isinstance(prompt, CompletionPrompt):
-            data["prompt"] = prompt.prompt
+        if self._cache is not None and (cached := self._cache.get(data)) is not None:
+            return cached
 
         response = self._api.post("/completions", body=data)
 
         if "error" in response:
             raise OpenAICodexError(response["error"])
 
-        return response["choices"][0]["text"]
+        text = response["choices"][0]["text"]
+
+        if self._cache is not None:
+            self._cache.set(data, text)
+
+        return text
+
+    def generate_code_batch(
+        self, prompts: list[CompletionPrompt], temperature: float, target_max_tokens: int
+    ) -> list[str]:
+        """
+        Generate code for multiple completion prompts in a single API request, and return the
+        generated code for each prompt, in the same order as the given prompts.
+
+        All prompts must have the same stop sequences. The maximum number of tokens to generate
+        is shared between prompts, and is determined by the longest prompt. Prompts with a
+        cached completion are not sent to the API. See `generate_code` for the meaning of the
+        remaining parameters.
+
+        Raise an `OpenAICodexError` if the API returns an error.
+
+        If the size of any prompt exceeds the maximum number of tokens allowed by the model,
+        raise a `ValueError`.
+        """
+
+        if not prompts:
+            return []
+
+        stop_sequences = prompts[0].stop_sequences
+
+        if any(prompt.stop_sequences != stop_sequences for prompt in prompts):
+            raise ValueError("All prompts in a batch must have the same stop sequences.")
+
+        # the body of the request that would be made for each prompt on its own, used as the
+        # cache key for that prompt
+        requests = [self._build_request(prompt, temperature, target_max_tokens) for prompt in prompts]
+        texts: list[Optional[str]] = [
+            self._cache.get(data) if self._cache is not None else None for data in requests
+        ]
+        missing = [i for i, text in enumerate(texts) if text is None]
+
+        if missing:
+            max_tokens = min(requests[i]["max_tokens"] for i in missing)
+
+            data = {
+                "model": CODEX_MODEL,
+                "max_tokens": max_tokens,
+                "temperature": temperature,
+                "stop": stop_sequences or None,
+                "prompt": [requests[i]["prompt"] for i in missing],
+            }
+
+            response = self._api.post("/completions", body=data)
+
+            if "error" in response:
+                raise OpenAICodexError(response["error"])
+
+            # choices are not guaranteed to be returned in order
+            choices = sorted(response["choices"], key=lambda choice: choice["index"])
+
+            for i, choice in zip(missing, choices):
+                texts[i] = choice["text"]
+
+                # only cache completions generated with the parameters of a single request
+                if self._cache is not None and requests[i]["max_tokens"] == max_tokens:
+                    self._cache.set(requests[i], choice["text"])
+
+        return [text or "" for text in texts]
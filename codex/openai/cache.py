@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Optional
+
+CACHE_VERSION = 1
+"""
+Included in every cache key. Increment this whenever the way prompts are built changes, so that
+stale completions are not reused.
+"""
+
+
+def get_default_cache_path() -> str:
+    """
+    Return the default location of the completion cache database, following the XDG base
+    directory specification.
+    """
+
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    return os.path.join(cache_home, "codex", "completions.db")
+
+
+class CompletionCache:
+    """
+    Persistent cache mapping completion requests to the text generated for them. Requests are
+    identified by every parameter sent to the API (model, prompt, suffix, stop sequences,
+    temperature and max_tokens), so a cached completion is only reused for an identical request.
+
+    Safe to use from multiple threads.
+    """
+
+    path: str
+    _connection: sqlite3.Connection
+    _lock: threading.Lock
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Open the cache database at the given path, or at the default location if no path is
+        given, creating it if necessary. Raise `OSError` or `sqlite3.Error` if it cannot be
+        opened.
+        """
+
+        self.path = path or get_default_cache_path()
+
+        if directory := os.path.dirname(self.path):
+            os.makedirs(directory, exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+
+        try:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, text TEXT NOT NULL)"
+            )
+            self._connection.commit()
+        except sqlite3.Error:
+            self._connection.close()
+            raise
+
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_key(request: dict[str, Any]) -> str:
+        """
+        Return the cache key for the given completion request body.
+        """
+
+        serialized = json.dumps([CACHE_VERSION, request], sort_keys=True)
+
+        return hashlib.blake2b(serialized.encode("utf-8"), digest_size=32).hexdigest()
+
+    def get(self, request: dict[str, Any]) -> Optional[str]:
+        """
+        Return the cached completion for the given request body, or `None` if there is none.
+        """
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT text FROM completions WHERE key = ?", (self.get_key(request),)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def set(self, request: dict[str, Any], text: str) -> None:
+        """
+        Store the completion generated for the given request body.
+        """
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO completions (key, text) VALUES (?, ?)",
+                (self.get_key(request), text),
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """
+        Close the underlying database connection. The cache may not be used afterwards.
+        """
+
+        with self._lock:
+            self._connection.close()
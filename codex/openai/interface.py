@@ -1,11 +1,21 @@
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Union
 import requests
+from requests.adapters import HTTPAdapter
 
+MAX_POOLED_CONNECTIONS = 32
+"""
+The maximum number of connections kept alive per host, which bounds how many concurrent
+requests can reuse a connection instead of opening a new one.
+"""
 
+
+@lru_cache(maxsize=64)
 def url_join(base: str, *components: str) -> str:
     """
     Join a base URL with a list of components, ensuring that there is exactly one
-    slash between each component.
+    slash between each component. Results are memoized, since the same few endpoints
+    are requested repeatedly.
 
     Example:
     ```
@@ -21,9 +31,31 @@ class APIInterface:
     base_url: str
     authorization_header: str
 
+    _session: requests.Session
+    """
+    Persistent session used for all requests, so that connections to the API are kept alive
+    and reused instead of being re-established for every request.
+    """
+
     def __init__(self, base_url: str, authorization_header: str) -> None:
         self.base_url = base_url
         self.authorization_header = authorization_header
+        self._session = requests.Session()
+
+        # the default pool only keeps 10 connections alive per host, which is fewer than the
+        # number of requests that may run at once when generating snippets concurrently
+        adapter = HTTPAdapter(
+            pool_connections=MAX_POOLED_CONNECTIONS, pool_maxsize=MAX_POOLED_CONNECTIONS
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+        self._session.headers.update(
+            {
+                "Authorization": self.authorization_header,
+                "Content-Type": "application/json",
+            }
+        )
 
     def post(self, endpoint: str, body: Any) -> dict:
         """
@@ -37,14 +69,7 @@ class APIInterface:
         Return the JSON response.
         """
 
-        return requests.post(
-            url_join(self.base_url, endpoint),
-            json=body,
-            headers={
-                "Authorization": self.authorization_header,
-                "Content-Type": "application/json",
-            },
-        ).json()
+        return self._session.post(url_join(self.base_url, endpoint), json=body).json()
 
     def get(self, endpoint: str, query: dict[str, str]) -> dict:
         """
@@ -58,11 +83,4 @@ class APIInterface:
         Return the JSON response.
         """
 
-        return requests.get(
-            url_join(self.base_url, endpoint),
-            params=query,
-            headers={
-                "Authorization": self.authorization_header,
-                "Content-Type": "application/json",
-            },
-        ).json()
+        return self._session.get(url_join(self.base_url, endpoint), params=query).json()
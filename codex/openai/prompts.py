@@ -1,7 +1,59 @@
 from __future__ import annotations
-from transformers import GPT2Tokenizer
+from functools import lru_cache
+from typing import Optional
+import re
+import tiktoken
 
-TOKENIZER: GPT2Tokenizer = GPT2Tokenizer.from_pretrained("gpt2")
+TOKENIZER: tiktoken.Encoding = tiktoken.get_encoding("p50k_base")
+"""
+The tokenizer used by the Codex models.
+"""
+
+_MAX_MEMOIZED_TEXT_LENGTH = 8192
+"""
+Texts up to this many characters have their token counts memoized by `count_tokens`. Longer
+texts are rarely counted more than once, and would keep large strings alive in the cache.
+"""
+
+
+_LINE_BOUNDARY = re.compile(r"(?<=\S\n)(?=\S)")
+"""
+Matches the start of each line that directly follows a line ending in a non-whitespace
+character and itself starts with one.
+
+The tokenizer never merges characters across such a boundary, since its pre-tokenization
+always ends a token at a single newline surrounded by non-whitespace. Encoding the text on
+either side of the boundary separately therefore produces exactly the same tokens as encoding
+the whole text.
+"""
+
+
+@lru_cache(maxsize=4096)
+def _encode_line(line: str) -> tuple[int, ...]:
+    return tuple(TOKENIZER.encode(line, disallowed_special=()))
+
+
+def encode(text: str) -> list[int]:
+    """
+    Return the token IDs of the given text. Special tokens such as `<|endoftext|>` are encoded
+    as ordinary text, since prompts may contain arbitrary user-provided text.
+
+    The text is encoded line by line, with the tokens of each line memoized. Prompts include
+    the code generated so far, so consecutive prompts share most of their lines, and only new
+    lines have to be encoded.
+    """
+
+    token_ids: list[int] = []
+
+    for line in _LINE_BOUNDARY.split(text):
+        token_ids.extend(_encode_line(line))
+
+    return token_ids
+
+
+@lru_cache(maxsize=1024)
+def _count_tokens_memoized(text: str) -> int:
+    return len(encode(text))
 
 
 def count_tokens(text: str) -> int:
@@ -9,14 +61,37 @@ def count_tokens(text: str) -> int:
     Return the number of tokens in the given text.
     """
 
-    return len(TOKENIZER.encode(text))
+    if len(text) <= _MAX_MEMOIZED_TEXT_LENGTH:
+        return _count_tokens_memoized(text)
+
+    return len(encode(text))
+
+
+EncodedText = tuple[str, list[int]]
+"""
+A string paired with its token IDs.
+"""
+
+
+def _encode_cached(text: str, encoded: Optional[EncodedText]) -> EncodedText:
+    """
+    Return `encoded` if it holds the token IDs of `text`, otherwise encode `text`.
+
+    Prompt text may be reassigned directly, so a cached encoding is only reused while the
+    prompt still refers to the exact same string object.
+    """
+
+    if encoded is not None and encoded[0] is text:
+        return encoded
+
+    return (text, encode(text))
 
 
 class BasePrompt:
     stop_sequences: list[str]
 
-    def __init__(self, stop_sequences: list[str] = []) -> None:
-        self.stop_sequences = stop_sequences
+    def __init__(self, stop_sequences: Optional[list[str]] = None) -> None:
+        self.stop_sequences = stop_sequences if stop_sequences is not None else []
 
     def set_stop_sequences(self, stop_sequences: list[str]) -> None:
         self.stop_sequences = stop_sequences
@@ -26,7 +101,7 @@ class BasePrompt:
 
     def get_token_count(self) -> int:
         """
-        Return the number of tokens in the prompt via GPT-2 tokenizer.
+        Return the number of tokens in the prompt via the Codex tokenizer.
         """
 
         raise NotImplementedError
@@ -45,33 +120,49 @@ class BasePrompt:
 
         raise NotImplementedError
 
+    def get_key(self) -> tuple:
+        """
+        Return a hashable value that is equal for prompts with identical content.
+        """
+
+        raise NotImplementedError
+
 
 class CompletionPrompt(BasePrompt):
     prompt: str
 
+    _encoded_prompt: Optional[EncodedText]
+    """
+    The most recently encoded prompt text, shared by `get_token_count` and `truncate_prompt`.
+    """
+
     def __init__(self, prompt: str) -> None:
         super().__init__()
 
         self.prompt = prompt
+        self._encoded_prompt = None
+
+    def _get_prompt_tokens(self) -> list[int]:
+        self._encoded_prompt = _encode_cached(self.prompt, self._encoded_prompt)
+
+        return self._encoded_prompt[1]
 
     def get_token_count(self) -> int:
-        return count_tokens(self.prompt)
+        return len(self._get_prompt_tokens())
 
     def truncate_prompt(self, max_tokens: int) -> None:
         """
         Truncate the prompt by removing tokens from the start of the prompt.
         """
 
-        # encode the prompt to get the token IDs
-        token_ids = TOKENIZER.encode(self.prompt)
+        token_ids = self._get_prompt_tokens()
 
         # if the prompt is already short enough, do nothing
         if len(token_ids) <= max_tokens:
             return
 
-        # remove tokens from the start of the prompt until it is short enough
-        while len(token_ids) > max_tokens:
-            token_ids.pop(0)
+        # remove tokens from the start of the prompt so that it is short enough
+        token_ids = token_ids[len(token_ids) - max_tokens :]
 
         # decode the token IDs back into text
         self.prompt = TOKENIZER.decode(token_ids)
@@ -82,6 +173,9 @@ class CompletionPrompt(BasePrompt):
 
         return clone
 
+    def get_key(self) -> tuple:
+        return ("completion", self.prompt, tuple(self.stop_sequences))
+
 
 class InsertionPrompt(BasePrompt):
     prefix: str
@@ -89,6 +183,13 @@ class InsertionPrompt(BasePrompt):
     min_prefix_tokens: int
     min_suffix_tokens: int
 
+    _encoded_prefix: Optional[EncodedText]
+    _encoded_suffix: Optional[EncodedText]
+    """
+    The most recently encoded prefix and suffix, shared by `get_token_count` and
+    `truncate_prompt`.
+    """
+
     def __init__(self, prefix: str, suffix: str) -> None:
         super().__init__()
 
@@ -98,8 +199,21 @@ class InsertionPrompt(BasePrompt):
         self.min_prefix_tokens = 0
         self.min_suffix_tokens = 0
 
+        self._encoded_prefix = None
+        self._encoded_suffix = None
+
+    def _get_prefix_tokens(self) -> list[int]:
+        self._encoded_prefix = _encode_cached(self.prefix, self._encoded_prefix)
+
+        return self._encoded_prefix[1]
+
+    def _get_suffix_tokens(self) -> list[int]:
+        self._encoded_suffix = _encode_cached(self.suffix, self._encoded_suffix)
+
+        return self._encoded_suffix[1]
+
     def get_token_count(self) -> int:
-        return count_tokens(self.prefix) + count_tokens(self.suffix)
+        return len(self._get_prefix_tokens()) + len(self._get_suffix_tokens())
 
     def set_truncation_settings(self, min_prefix_tokens: int, min_suffix_tokens: int) -> None:
         """
@@ -122,8 +236,8 @@ class InsertionPrompt(BasePrompt):
         a ValueError.
         """
 
-        prefix_tokens = TOKENIZER.encode(self.prefix)
-        suffix_tokens = TOKENIZER.encode(self.suffix)
+        prefix_tokens = self._get_prefix_tokens()
+        suffix_tokens = self._get_suffix_tokens()
 
         # if the prompt is already short enough, do nothing
         if len(prefix_tokens) + len(suffix_tokens) <= max_tokens:
@@ -134,19 +248,20 @@ class InsertionPrompt(BasePrompt):
         if self.min_prefix_tokens + self.min_suffix_tokens > max_tokens:
             raise ValueError("The combined minimum number of tokens is greater than `max_tokens`.")
 
-        # remove tokens from the start of the prefix until it is short enough
-        while (
-            len(prefix_tokens) + len(suffix_tokens) > max_tokens
-            and len(prefix_tokens) > self.min_prefix_tokens
-        ):
-            prefix_tokens.pop(0)
+        excess_tokens = len(prefix_tokens) + len(suffix_tokens) - max_tokens
+
+        # remove as many tokens as needed (and allowed) from the start of the prefix
+        removed_from_prefix = min(
+            max(len(prefix_tokens) - self.min_prefix_tokens, 0), excess_tokens
+        )
+        prefix_tokens = prefix_tokens[removed_from_prefix:]
+        excess_tokens -= removed_from_prefix
 
-        # remove tokens from the end of the suffix until it is short enough
-        while (
-            len(prefix_tokens) + len(suffix_tokens) > max_tokens
-            and len(suffix_tokens) > self.min_suffix_tokens
-        ):
-            suffix_tokens.pop(0)
+        # remove the remaining excess tokens from the end of the suffix
+        removed_from_suffix = min(
+            max(len(suffix_tokens) - self.min_suffix_tokens, 0), excess_tokens
+        )
+        suffix_tokens = suffix_tokens[: len(suffix_tokens) - removed_from_suffix]
 
         # decode the token IDs back into text
         self.prefix = TOKENIZER.decode(prefix_tokens)
@@ -157,3 +272,6 @@ class InsertionPrompt(BasePrompt):
         prompt.set_truncation_settings(self.min_prefix_tokens, self.min_suffix_tokens)
         prompt.set_stop_sequences(self.get_stop_sequences())
         return prompt
+
+    def get_key(self) -> tuple:
+        return ("insertion", self.prefix, self.suffix, tuple(self.stop_sequences))
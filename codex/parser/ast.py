@@ -5,20 +5,22 @@ from codex.parser.source import CodexSource
 SymbolName = str
 
 
-@dataclass
+@dataclass(slots=True)
 class Location:
     source: CodexSource
     line_no: int
 
 
 class ASTNode:
+    __slots__ = ("location",)
+
     location: Location
 
     def __init__(self, location: Location) -> None:
         self.location = location
 
 
-@dataclass
+@dataclass(slots=True)
 class PromptData:
     """
     Dataclass member of some AST nodes that represent an associated AI prompt.
@@ -33,6 +35,8 @@ class PromptNode(ASTNode):
     Represents any AST node that contains a prompt.
     """
 
+    __slots__ = ("prompt",)
+
     prompt: PromptData
 
     def __init__(self, location: Location, prompt: PromptData) -> None:
@@ -41,10 +45,12 @@ class PromptNode(ASTNode):
 
 
 class ActionStatementNode(PromptNode):
-    pass
+    __slots__ = ()
 
 
 class VariableDeclarationNode(PromptNode):
+    __slots__ = ("variable_name", "type")
+
     variable_name: SymbolName
     type: Optional[str]
 
@@ -61,6 +67,8 @@ class VariableDeclarationNode(PromptNode):
 
 
 class UsingDirectiveNode(ASTNode):
+    __slots__ = ("module_name",)
+
     module_name: str
 
     def __init__(self, location: Location, module_name: str) -> None:
@@ -69,6 +77,8 @@ class UsingDirectiveNode(ASTNode):
 
 
 class PromptedFunctionDeclarationNode(PromptNode):
+    __slots__ = ("function_name", "arguments", "return_type")
+
     function_name: str
     arguments: list[tuple[str, Optional[str]]]
     return_type: Optional[str]
@@ -89,12 +99,14 @@ class PromptedFunctionDeclarationNode(PromptNode):
 
 
 class CodeBlock(ASTNode):
+    __slots__ = ("children",)
+
     children: list[ASTNode]
 
-    def __init__(self, location: Location, children: list[ASTNode] = []) -> None:
+    def __init__(self, location: Location, children: Optional[list[ASTNode]] = None) -> None:
         super().__init__(location)
-        self.children = children
+        self.children = children if children is not None else []
 
 
 class Module(CodeBlock):
-    pass
+    __slots__ = ()
@@ -28,7 +28,7 @@ class ExpressionMatchError(Exception):
         self.message = message
 
 
-@dataclass
+@dataclass(slots=True)
 class MatchResult:
     matched_string: str
     named_groups: dict[str, MatchResult] = field(default_factory=dict)
@@ -59,7 +59,17 @@ class MatchResult:
         return self.indexed_groups[index]
 
 
+_CONTEXT_SENSITIVE_REGEX = re.compile(r"\^|\\[AbB]|\(\?(?![:=!])")
+"""
+Matches regex syntax whose meaning may depend on the text preceding the match position, such
+as anchors, word boundaries and lookbehinds, or that cannot be embedded in a larger pattern,
+such as inline flags. May also match harmless syntax, such as a negated character class.
+"""
+
+
 class Expression:
+    __slots__ = ("name",)
+
     name: Optional[str]
 
     def __init__(self) -> None:
@@ -70,6 +80,13 @@ class Expression:
         Returns a MatchResult object if this expression matches `string`, and `None` otherwise.
         """
 
+        return self.match_at(string, 0, throw_on_failure)
+
+    def match_at(self, string: str, pos: int, throw_on_failure=False) -> Optional[MatchResult]:
+        """
+        Like `match`, but match `string[pos:]`, without copying it.
+        """
+
         raise NotImplementedError
 
     def with_name(self, name: str):  # return type intentionally omitted, as to be inferred
@@ -92,25 +109,38 @@ class Expression:
 
 
 class Literal(Expression):
+    __slots__ = ("literal", "case_sensitive", "_lowercase_literal")
+
     literal: str
     case_sensitive: bool
 
+    _lowercase_literal: str
+    """
+    `literal` in lowercase, used for case-insensitive matching.
+    """
+
     def __init__(self, literal: str, case_sensitive=True) -> None:
         super().__init__()
         self.literal = literal
         self.case_sensitive = case_sensitive
+        self._lowercase_literal = literal.lower()
 
-    def match(self, string: str, throw_on_failure=False) -> Optional[MatchResult]:
+    def match_at(self, string: str, pos: int, throw_on_failure=False) -> Optional[MatchResult]:
         if self.case_sensitive:
-            if string.startswith(self.literal):
+            if string.startswith(self.literal, pos):
                 return MatchResult(self.literal)
         else:
-            if string.lower().startswith(self.literal.lower()):
-                return MatchResult(string[: len(self.literal) + 1])
+            # only lowercase the part of the string that could match the literal
+            prefix = string[pos : pos + len(self.literal)]
+
+            if prefix.lower() == self._lowercase_literal:
+                return MatchResult(prefix)
 
         if throw_on_failure:
+            remaining = string[pos:]
+
             raise ExpressionMatchError(
-                string, f"Expected {self.human_representation()}, but got {but_got(string)}"
+                remaining, f"Expected {self.human_representation()}, but got {but_got(remaining)}"
             )
 
         return None
@@ -123,20 +153,38 @@ class Literal(Expression):
 
 
 class Regex(Expression):
+    __slots__ = ("regex", "_pattern", "_context_sensitive")
+
     regex: str
+    _pattern: re.Pattern
+
+    _context_sensitive: bool
+    """
+    Whether the regex may behave differently when matched at a position of a string than when
+    matched against the remainder of the string from that position; see
+    `_CONTEXT_SENSITIVE_REGEX`. If so, the remainder of the string is copied before matching.
+    """
 
     def __init__(self, regex: str) -> None:
         super().__init__()
         self.regex = regex
+        self._pattern = re.compile(regex)
+        self._context_sensitive = _CONTEXT_SENSITIVE_REGEX.search(regex) is not None
+
+    def match_at(self, string: str, pos: int, throw_on_failure=False) -> Optional[MatchResult]:
+        if self._context_sensitive:
+            match = self._pattern.match(string[pos:])
+        else:
+            match = self._pattern.match(string, pos)
 
-    def match(self, string: str, throw_on_failure=False) -> Optional[MatchResult]:
-        match = re.match(self.regex, string)
         if match:
             return MatchResult(match.group())
 
         if throw_on_failure:
+            remaining = string[pos:]
+
             raise ExpressionMatchError(
-                string, f"Expected {self.human_representation()}, but got {but_got(string)}"
+                remaining, f"Expected {self.human_representation()}, but got {but_got(remaining)}"
             )
 
         return None
@@ -148,14 +196,35 @@ class Regex(Expression):
         return f"/{self.regex}/"
 
 
-@dataclass
+def _to_fused_fragment(expression: Expression) -> Optional[str]:
+    """
+    Return a regex fragment that, when matched at some position of a string, matches exactly
+    what `expression.match` matches given the remainder of the string from that position.
+
+    Return `None` if the expression cannot be expressed this way.
+    """
+
+    if type(expression) is Literal and expression.case_sensitive:
+        return re.escape(expression.literal)
+
+    if (
+        type(expression) is Regex
+        and expression._pattern.groups == 0
+        and not expression._context_sensitive
+    ):
+        return expression.regex
+
+    return None
+
+
+@dataclass(slots=True)
 class ExprComponent:
     expression: Expression
     optional: bool = False
     group_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class SoftMatchResult:
     match_result: Optional[MatchResult] = None
     num_parts_matched_successfully: int = 0
@@ -165,8 +234,17 @@ class SoftMatchResult:
 
 
 class CompoundExpression(Expression):
+    __slots__ = ("components", "_fused_pattern")
+
     components: list[ExprComponent]
 
+    _fused_pattern: Optional[re.Pattern]
+    """
+    A single pattern equivalent to matching each component in turn, used to match the entire
+    expression in one call. `None` unless every component is a case-sensitive `Literal` or a
+    `Regex` that can be embedded in a larger pattern; see `_to_fused_fragment`.
+    """
+
     def __init__(self, components: list[ExprComponent]) -> None:
         super().__init__()
         self.components = components
@@ -185,8 +263,59 @@ class CompoundExpression(Expression):
 
                 group_names.add(component.group_name)
 
-    def match(self, string: str, throw_on_failure=False) -> Optional[MatchResult]:
-        soft_match = self.soft_match(string, throw_on_failure)
+        self._fused_pattern = self._compile_fused_pattern()
+
+    def _compile_fused_pattern(self) -> Optional[re.Pattern]:
+        fragments: list[str] = []
+
+        for i, component in enumerate(self.components):
+            fragment = _to_fused_fragment(component.expression)
+
+            if fragment is None:
+                return None
+
+            # components are matched one after another without backtracking, so each one is
+            # matched inside a lookahead, which Python never backtracks into, and the text it
+            # matched is then consumed using a backreference. Optional components are consumed
+            # only if they matched.
+            if component.optional:
+                fragments.append(f"(?=(?P<c{i}>{fragment})?)(?(c{i})(?P=c{i}))")
+            else:
+                fragments.append(f"(?=(?P<c{i}>{fragment}))(?P=c{i})")
+
+        return re.compile("".join(fragments))
+
+    def _fused_soft_match(self, string: str, pos: int) -> Optional[SoftMatchResult]:
+        """
+        Match the entire expression against `string[pos:]` using `_fused_pattern`, and return
+        `None` if it does not match.
+        """
+
+        assert self._fused_pattern is not None
+
+        match = self._fused_pattern.match(string, pos)
+
+        if not match:
+            return None
+
+        result = MatchResult(match.group())
+        num_parts_matched_successfully = 0
+
+        for i, component in enumerate(self.components):
+            component_string = match.group(f"c{i}")
+
+            if component_string is None:
+                continue
+
+            if component.group_name:
+                result.named_groups[component.group_name] = MatchResult(component_string)
+
+            num_parts_matched_successfully += 1
+
+        return SoftMatchResult(result, num_parts_matched_successfully)
+
+    def match_at(self, string: str, pos: int, throw_on_failure=False) -> Optional[MatchResult]:
+        soft_match = self.soft_match_at(string, pos, throw_on_failure)
 
         if soft_match.successful():
             return soft_match.match_result
@@ -197,41 +326,56 @@ class CompoundExpression(Expression):
         matched successfully.
         """
 
-        result: Optional[MatchResult] = MatchResult("")
+        return self.soft_match_at(string, 0, throw_on_failure)
+
+    def soft_match_at(self, string: str, pos: int, throw_on_failure=False) -> SoftMatchResult:
+        """
+        Like `soft_match`, but match `string[pos:]`, without copying it.
+        """
+
+        # try to match the whole expression at once; if that fails, match component by
+        # component to find out how many parts match and produce the appropriate error
+        if self._fused_pattern is not None:
+            if fused_match := self._fused_soft_match(string, pos):
+                return fused_match
+
+        start = pos
+        named_groups: dict[str, MatchResult] = {}
         num_parts_matched_successfully = 0
 
         for component in self.components:
-            match = component.expression.match(
-                string, throw_on_failure=throw_on_failure and not component.optional
+            match = component.expression.match_at(
+                string, pos, throw_on_failure=throw_on_failure and not component.optional
             )
 
-            # if not component.optional: print(match, component.expression.human_representation(), "for", self.human_representation(), repr(result.matched_string))
-
             if match:
-                result.matched_string += match.matched_string
-
-                # remove the matched part from the string
-                string = string[match.get_match_length() :]
+                # skip past the matched part of the string
+                pos += match.get_match_length()
 
                 # capture named group, if applicable
                 if component.group_name:
-                    result.named_groups[component.group_name] = match
+                    named_groups[component.group_name] = match
 
                 num_parts_matched_successfully += 1
             elif not component.optional:
                 if throw_on_failure:
+                    remaining = string[pos:]
+
                     raise ExpressionMatchError(
-                        string,
-                        f"Expected {component.expression.human_representation()}, but got {but_got(string)}",
+                        remaining,
+                        f"Expected {component.expression.human_representation()}, but got {but_got(remaining)}",
                     )
 
-                result = None
-                break
+                return SoftMatchResult(None, num_parts_matched_successfully)
 
-        return SoftMatchResult(result, num_parts_matched_successfully)
+        return SoftMatchResult(
+            MatchResult(string[start:pos], named_groups), num_parts_matched_successfully
+        )
 
 
 class UnionExpression(Expression):
+    __slots__ = ("expressions",)
+
     expressions: list[Expression]
 
     def __init__(self, expressions: list[Expression]) -> None:
@@ -245,15 +389,17 @@ class UnionExpression(Expression):
         if len(self.expressions) == 0:
             raise ValueError("UnionExpression must have at least one expression.")
 
-    def match(self, string: str, throw_on_failure=False) -> Optional[MatchResult]:
+    def match_at(self, string: str, pos: int, throw_on_failure=False) -> Optional[MatchResult]:
         for expression in self.expressions:
-            match = expression.match(string, throw_on_failure=False)
+            match = expression.match_at(string, pos, throw_on_failure=False)
             if match:
                 return match
 
         if throw_on_failure:
+            remaining = string[pos:]
+
             raise ExpressionMatchError(
-                string, f"Expected {self.human_representation()}, but got {but_got(string)}"
+                remaining, f"Expected {self.human_representation()}, but got {but_got(remaining)}"
             )
 
         return None
@@ -272,6 +418,8 @@ class UnionExpression(Expression):
 
 
 class Repeated(Expression):
+    __slots__ = ("expression", "min_count", "max_count")
+
     expression: Expression
     min_count: int
     max_count: Optional[int]
@@ -290,16 +438,18 @@ class Repeated(Expression):
         if self.max_count is not None and self.max_count < self.min_count:
             raise ValueError("max_count must be >= min_count")
 
-    def match(self, string: str, throw_on_failure=False) -> Optional[MatchResult]:
-        result = MatchResult("")
+    def match_at(self, string: str, pos: int, throw_on_failure=False) -> Optional[MatchResult]:
+        start = pos
+        indexed_groups: list[MatchResult] = []
         count = 0
 
         while True:
-            match = self.expression.match(string, throw_on_failure)
+            # the repetition always ends with a failed attempt, so the element must not throw;
+            # the count checks below raise their own errors
+            match = self.expression.match_at(string, pos, throw_on_failure=False)
             if match:
-                result.matched_string += match.matched_string
-                result.indexed_groups.append(match)
-                string = string[match.get_match_length() :]
+                indexed_groups.append(match)
+                pos += match.get_match_length()
                 count += 1
             else:
                 break
@@ -307,7 +457,7 @@ class Repeated(Expression):
         if count < self.min_count:
             if throw_on_failure:
                 raise ExpressionMatchError(
-                    string,
+                    string[pos:],
                     f"Expected at least {self.min_count} matches of {self.expression.human_representation()}, but got {count}.",
                 )
 
@@ -316,13 +466,13 @@ class Repeated(Expression):
         if self.max_count is not None and count > self.max_count:
             if throw_on_failure:
                 raise ExpressionMatchError(
-                    string,
+                    string[pos:],
                     f"Expected at most {self.max_count} matches of {self.expression.human_representation()}, but got {count}.",
                 )
 
             return None
 
-        return result
+        return MatchResult(string[start:pos], indexed_groups=indexed_groups)
 
     def human_representation(self) -> str:
         if self.name:
@@ -357,18 +507,28 @@ def identify_string(
     Return `None` if no compound expression matches any compponents of the expression.
     """
 
-    for expression in candidate_expressions:
-        match = expression.soft_match(string)
-        if match.successful():
-            return expression
+    return identify_and_match_string(string, candidate_expressions)[0]
+
+
+def identify_and_match_string(
+    string: str, candidate_expressions: list[CompoundExpression]
+) -> tuple[Optional[CompoundExpression], Optional[MatchResult]]:
+    """
+    Like `identify_string`, but also return the result of matching the identified expression
+    against the string, so that it does not need to be matched again. The match result is
+    `None` if no expression matched successfully.
+    """
 
     best_match: Optional[CompoundExpression] = None
     best_match_num_parts_matched_successfully = 0
 
     for expression in candidate_expressions:
         match = expression.soft_match(string)
+        if match.successful():
+            return expression, match.match_result
+
         if match.num_parts_matched_successfully > best_match_num_parts_matched_successfully:
             best_match = expression
             best_match_num_parts_matched_successfully = match.num_parts_matched_successfully
 
-    return best_match
+    return best_match, None
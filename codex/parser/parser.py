@@ -1,4 +1,5 @@
-from typing import NoReturn, Optional
+from functools import lru_cache
+from typing import Callable, NoReturn, Optional
 from dataclasses import dataclass
 
 from codex.parser.errors import CodexSyntaxError
@@ -23,19 +24,143 @@ from codex.parser.ast import (
     UsingDirectiveNode,
     VariableDeclarationNode,
 )
-from codex.parser.grammar import identify_string, ExpressionMatchError
+from codex.parser.grammar import (
+    CompoundExpression,
+    Literal,
+    MatchResult,
+    identify_and_match_string,
+    ExpressionMatchError,
+)
 
 
 # Measured in spaces OR tabs
 IndentationLevel = int
 
 
+STATEMENT_EXPRESSIONS = [
+    ActionStatement,
+    VariableDeclaration,
+    UsingDirective,
+    PromptedFunctionDeclaration,
+]
+"""
+Expressions for every kind of statement, in the order they are tried.
+"""
+
+
+def _get_leading_character(expression: CompoundExpression) -> Optional[str]:
+    """
+    Return the character that every match of the given expression must start with, or `None`
+    if there is no such character.
+    """
+
+    first = expression.components[0]
+
+    if first.optional or not isinstance(first.expression, Literal):
+        return None
+
+    if not first.expression.case_sensitive or not first.expression.literal:
+        return None
+
+    return first.expression.literal[0]
+
+
+def _group_by_leading_character(
+    expressions: list[CompoundExpression],
+) -> tuple[dict[str, list[CompoundExpression]], list[CompoundExpression]]:
+    """
+    Return, for each leading character, the expressions that could match a string starting with
+    it, along with the expressions that could match a string starting with any other character.
+    Expressions keep their relative order.
+    """
+
+    leading_characters = [_get_leading_character(expression) for expression in expressions]
+    unkeyed = [e for e, c in zip(expressions, leading_characters) if c is None]
+
+    by_character = {
+        character: [e for e, c in zip(expressions, leading_characters) if c in (character, None)]
+        for character in leading_characters
+        if character is not None
+    }
+
+    return by_character, unkeyed
+
+
+_STATEMENTS_BY_LEADING_CHARACTER, _UNKEYED_STATEMENTS = _group_by_leading_character(
+    STATEMENT_EXPRESSIONS
+)
+"""
+Statement expressions grouped by the first character of the lines they could match, so that
+statements which cannot match a line are not tried. An expression that fails on its first
+component matches no parts, so leaving it out does not change which statement is identified.
+"""
+
+
+@lru_cache(maxsize=4096)
+def identify_statement(line: str) -> tuple[Optional[CompoundExpression], Optional[MatchResult]]:
+    """
+    Return the statement expression that best matches the given line, with indentation removed,
+    along with its match result if it matched successfully. See `identify_and_match_string`.
+
+    Results are memoized, since the result depends only on the line itself. Match results may
+    therefore be shared between lines, and must not be modified.
+    """
+
+    candidates = _STATEMENTS_BY_LEADING_CHARACTER.get(line[:1], _UNKEYED_STATEMENTS)
+
+    return identify_and_match_string(line, candidates)
+
+
+def _build_action_statement(match: MatchResult, location: Location) -> ASTNode:
+    prompt = extract_prompt(match.get_named_group(GROUP_PROMPT))
+
+    return ActionStatementNode(location, prompt)
+
+
+def _build_variable_declaration(match: MatchResult, location: Location) -> ASTNode:
+    variable_name, type_name = extract_symbol_decl_info(match)
+    prompt = extract_prompt(match.get_named_group(GROUP_PROMPT))
+
+    return VariableDeclarationNode(location, variable_name, type_name, prompt)
+
+
+def _build_using_directive(match: MatchResult, location: Location) -> ASTNode:
+    return UsingDirectiveNode(location, extract_module_name(match))
+
+
+def _build_prompted_function_declaration(match: MatchResult, location: Location) -> ASTNode:
+    prompt = extract_prompt(match.get_named_group(GROUP_PROMPT))
+    func_name, return_type = extract_symbol_decl_info(match)
+
+    arguments = extract_function_arguments(match.get_named_group("arguments"))
+
+    return PromptedFunctionDeclarationNode(
+        location=location,
+        function_name=func_name,
+        return_type=return_type,
+        prompt=prompt,
+        arguments=arguments,
+    )
+
+
+_NODE_BUILDERS: dict[CompoundExpression, Callable[[MatchResult, Location], ASTNode]] = {
+    ActionStatement: _build_action_statement,
+    VariableDeclaration: _build_variable_declaration,
+    UsingDirective: _build_using_directive,
+    PromptedFunctionDeclaration: _build_prompted_function_declaration,
+}
+"""
+Maps each statement expression to the function that builds its AST node from a match.
+"""
+
+
 def is_blank_string(s: str) -> bool:
     """
     Return `True` if the given string is empty or contains only whitespace characters.
     """
 
-    return s.strip() == ""
+    # isspace is False for the empty string, but does not copy the string like strip does
+    return not s or s.isspace()
 
 
 class Parser:
@@ -90,11 +215,10 @@ class Parser:
 
     def parse_current_line(
         self, enclosing_indentation_level: IndentationLevel
-    ) -> Optional[tuple[ASTNode, IndentationLevel]]:
+    ) -> Optional[ASTNode]:
         """
-        Parse the current line and return the a tuple, where the first element is an AST node
-        representing the current line, and the second element is the indentation level of the
-        current line.
+        Parse the current line and return an AST node representing it. Raise a syntax error if
+        the line is indented further than the enclosing indentation level.
 
         If there is no semantic meaning to the current line, e.g. an empty line, return None.
         """
@@ -106,7 +230,7 @@ class Parser:
         if is_blank_string(line):
             return None
 
-        indentation, trimmed_line = self.get_indentation_of_current_line()
+        indentation, trimmed_line = self.get_indentation_of_current_line(line)
 
         # ignore comments
 
@@ -123,14 +247,11 @@ class Parser:
 
         # identify the statement type, raising an error if it could not be identified
 
-        identified_expr = identify_string(
-            trimmed_line,
-            [ActionStatement, VariableDeclaration, UsingDirective, PromptedFunctionDeclaration],
-        )
+        identified_expr, match = identify_statement(trimmed_line)
 
         if identified_expr is None:
             self.raise_syntax_error_at_current_line(
-                f"Unrecognized token or keyword {trimmed_line.split(' ')[0]!r}"
+                f"Unrecognized token or keyword {trimmed_line.partition(' ')[0]!r}"
             )
 
         # parse the statement
@@ -138,43 +259,15 @@ class Parser:
         location = self._get_current_source_location()
 
         try:
-            match = identified_expr.match(trimmed_line, throw_on_failure=True)
-            assert match is not None
-
-            if identified_expr == ActionStatement:
-                prompt = extract_prompt(match.get_named_group(GROUP_PROMPT))
-                node = ActionStatementNode(location, prompt)
-
-                return node, indentation
+            # the statement was only partially matched; match it again to produce the error
+            if match is None:
+                match = identified_expr.match(trimmed_line, throw_on_failure=True)
+                assert match is not None
 
-            if identified_expr == VariableDeclaration:
-                variable_name, type_name = extract_symbol_decl_info(match)
-                prompt = extract_prompt(match.get_named_group(GROUP_PROMPT))
+            build_node = _NODE_BUILDERS.get(identified_expr)
 
-                node = VariableDeclarationNode(location, variable_name, type_name, prompt)
-
-                return node, indentation
-
-            if identified_expr == UsingDirective:
-                module_name = extract_module_name(match)
-
-                return UsingDirectiveNode(location, module_name), indentation
-
-            if identified_expr == PromptedFunctionDeclaration:
-                prompt = extract_prompt(match.get_named_group(GROUP_PROMPT))
-                func_name, return_type = extract_symbol_decl_info(match)
-
-                arguments = extract_function_arguments(match.get_named_group("arguments"))
-
-                node = PromptedFunctionDeclarationNode(
-                    location=location,
-                    function_name=func_name,
-                    return_type=return_type,
-                    prompt=prompt,
-                    arguments=arguments,
-                )
-
-                return node, indentation
+            if build_node is not None:
+                return build_node(match, location)
 
         except ExpressionMatchError as e:
             self.raise_syntax_error_at_current_line(e.message)
@@ -192,13 +285,13 @@ class Parser:
 
         module = Module(self._get_current_source_location())
 
-        while not self.at_end():
-            parse_result = self.parse_current_line(0)
+        for line_idx in range(self.source.get_line_count()):
+            self.current_line_idx = line_idx
 
-            if parse_result is not None:
-                module.children.append(parse_result[0])
+            node = self.parse_current_line(0)
 
-            self.next_line()
+            if node is not None:
+                module.children.append(node)
 
         return module
 
@@ -211,46 +304,34 @@ class Parser:
 
         raise CodexSyntaxError(self.source, self.get_current_line_number(), message, note)
 
-    def get_indentation_of_current_line(self) -> tuple[IndentationLevel, str]:
+    def get_indentation_of_current_line(self, line: str) -> tuple[IndentationLevel, str]:
         """
         Return a tuple where the first element is the indentation level of the current line,
-        and the second element is the line without the indentation.
+        and the second element is the line without the indentation. `line` must be the current
+        line, as returned by `get_current_line`.
 
         The indentation level is measured in spaces OR tabs.
         Mixed indentation is not allowed. If the line is empty, the indentation level is 0.
         """
 
-        line = self.get_current_line()
+        trimmed_line = line.lstrip(" \t")
+        indentation_level = len(line) - len(trimmed_line)
+
+        if indentation_level == 0:
+            return 0, line
+
+        indentation = line[:indentation_level]
+
+        if line[0] == " " and "\t" in indentation:
+            self.raise_syntax_error_at_current_line(
+                "Mixed indentation is not allowed.",
+                note="Line starts with a space, but contains tabs.",
+            )
+
+        if line[0] == "\t" and " " in indentation:
+            self.raise_syntax_error_at_current_line(
+                "Mixed indentation is not allowed.",
+                note="Line starts with a tab, but contains spaces.",
+            )
 
-        MODE_UNASSIGNED = 0
-        MODE_SPACES = 1
-        MODE_TABS = 2
-
-        indentation_level = 0
-        indentation_mode = 0
-
-        for char in line:
-            if char == " ":
-                if indentation_mode == MODE_UNASSIGNED:
-                    indentation_mode = MODE_SPACES
-                elif indentation_mode == MODE_TABS:
-                    self.raise_syntax_error_at_current_line(
-                        "Mixed indentation is not allowed.",
-                        note="Line starts with a tab, but contains spaces.",
-                    )
-
-                indentation_level += 1
-            elif char == "\t":
-                if indentation_mode == MODE_UNASSIGNED:
-                    indentation_mode = MODE_TABS
-                elif indentation_mode == MODE_SPACES:
-                    self.raise_syntax_error_at_current_line(
-                        "Mixed indentation is not allowed.",
-                        note="Line starts with a space, but contains tabs.",
-                    )
-
-                indentation_level += 1
-            else:
-                break
-
-        return indentation_level, line[indentation_level:]
+        return indentation_level, trimmed_line
@@ -1,12 +1,18 @@
 from __future__ import annotations
 import os
+from array import array
 from typing import Optional
 from pathlib import Path
 
 
 class CodexSource:
     _content: str
-    _lines: list[str]
+    _line_offsets: array[int]
+    """
+    The index in `_content` at which each line starts, followed by one past the end of the
+    content. Lines are sliced from the content on demand rather than stored separately.
+    """
+
     _path: Optional[str]
 
     def __init__(self, from_string: str, path: Optional[str]) -> None:
@@ -19,7 +25,15 @@ class CodexSource:
         from_string = from_string.replace("\r\n", "\n")
 
         self._content = from_string
-        self._lines = from_string.split("\n")
+        self._line_offsets = array("q", [0])
+
+        line_end = from_string.find("\n")
+
+        while line_end != -1:
+            self._line_offsets.append(line_end + 1)
+            line_end = from_string.find("\n", line_end + 1)
+
+        self._line_offsets.append(len(from_string) + 1)
 
         self._path = path
 
@@ -35,10 +49,10 @@ class CodexSource:
     @staticmethod
     def from_file(path: str) -> CodexSource:
         """
-        Read the source from the given file path.
+        Read the source from the given UTF-8 encoded file path.
         """
 
-        with open(path, "r") as f:
+        with open(path, "r", encoding="utf-8") as f:
             return CodexSource(f.read(), path)
 
 
@@ -57,21 +71,28 @@ class CodexSource:
         Return the line at the given index.
         """
 
-        return self._lines[index]
+        offsets = self._line_offsets
+
+        # checked inline rather than with is_line_index_valid, since this is called for every line
+        if not 0 <= index < len(offsets) - 1:
+            raise IndexError("line index out of range")
+
+        # the end offset of each line is one past its newline
+        return self._content[offsets[index] : offsets[index + 1] - 1]
 
     def get_line_by_number(self, number: int) -> str:
         """
         Return the line at the given number, starting at 1.
         """
 
-        return self._lines[number - 1]
+        return self.get_line_by_index(number - 1)
 
     def get_line_count(self) -> int:
         """
         Return the number of lines in the source.
         """
 
-        return len(self._lines)
+        return len(self._line_offsets) - 1
 
     def is_line_number_valid(self, number: int) -> bool:
         """
@@ -11,7 +11,6 @@ from codex.parser.grammar import (
     Repeated,
     Literal,
     Regex,
-    UnionExpression,
 )
 
 ### Macros ###
@@ -25,7 +24,7 @@ SQ_BRACKET_CLOSE = Literal("]")
 L_PAREN = Literal("(")
 R_PAREN = Literal(")")
 EXCLAMATION_MARK = Literal("!")
-NON_EMPTY_TEXT = Regex(r".{0,}\S.{0,}").with_name("non-empty text")
+NON_EMPTY_TEXT = Regex(r"(?:(?!\n)\s)*\S.*").with_name("non-empty text")
 COMMA = Literal(",")
 
 # compound group names
@@ -53,33 +52,23 @@ COMPONENT_OPT_TYPE = ExprComponent(
 
 ### Expressions ###
 
-_AIGenerativeParameterNonLast = CompoundExpression(
+_AIGenerativeParameter = CompoundExpression(
     [
         COMPONENT_OPT_WHITESPACE,
-        ExprComponent(SYMBOL_NAME, group_name="symbol_name"),
-        COMPONENT_OPT_WHITESPACE,
-        ExprComponent(COMMA),
-    ]
-).with_name("non-last parameter")
-
-_AIGenerativeParameterLast = CompoundExpression(
-    [
-        COMPONENT_OPT_WHITESPACE,
-        ExprComponent(SYMBOL_NAME, group_name="symbol_name"),
+        ExprComponent(SYMBOL_NAME, group_name=GROUP_SYMBOL_NAME),
         COMPONENT_OPT_WHITESPACE,
+        # a comma, unless it is the last parameter
+        ExprComponent(Regex(r",(?!\s*\])|(?=\])").with_name("',' and another parameter, or ']'")),
     ]
-).with_name("last parameter")
+).with_name("parameter")
 
-_AIGenerativeParametersMultiple = CompoundExpression(
+_AIGenerativeParameters = CompoundExpression(
     [
         ExprComponent(SQ_BRACKET_OPEN),
-        ExprComponent(
-            Repeated(_AIGenerativeParameterNonLast, min_count=0), group_name="non_last_parameters"
-        ),
-        ExprComponent(_AIGenerativeParameterLast, group_name="last_parameter"),
+        ExprComponent(Repeated(_AIGenerativeParameter, min_count=1), group_name="parameter_list"),
         ExprComponent(SQ_BRACKET_CLOSE),
     ]
-).with_name("multiple parameters")
+).with_name("parameters")
 """
 Syntax:
 ```
@@ -87,27 +76,9 @@ Syntax:
 ```
 """
 
-_AIGenerativeParametersSingle = CompoundExpression(
-    [
-        ExprComponent(SQ_BRACKET_OPEN),
-        ExprComponent(_AIGenerativeParameterLast, group_name="last_parameter"),
-        ExprComponent(SQ_BRACKET_CLOSE),
-    ]
-).with_name("single parameter")
-"""
-Syntax:
-```
-[<parameter_name>]
-```
-"""
-
 AIPrompt = CompoundExpression(
     [
-        ExprComponent(
-            UnionExpression([_AIGenerativeParametersMultiple, _AIGenerativeParametersSingle]),
-            group_name=GROUP_PARAMETERS,
-            optional=True,
-        ),
+        ExprComponent(_AIGenerativeParameters, group_name=GROUP_PARAMETERS, optional=True),
         COMPONENT_OPT_WHITESPACE,
         ExprComponent(Literal(":")),
         COMPONENT_OPT_WHITESPACE,
@@ -168,43 +139,25 @@ using <module_name>
 ```
 """
 
-_FuncArgumentNonLast = CompoundExpression(
+_FuncArgument = CompoundExpression(
     [
         COMPONENT_OPT_WHITESPACE,
         COMPONENT_OPT_TYPE,
         ExprComponent(SYMBOL_NAME, group_name=GROUP_SYMBOL_NAME),
         COMPONENT_OPT_WHITESPACE,
-        ExprComponent(COMMA),
+        # a comma, unless it is the last argument
+        ExprComponent(Regex(r",(?!\s*\))|(?=\))").with_name("',' and another argument, or ')'")),
     ]
-)
+).with_name("argument")
 
-_FuncArgumentLast = CompoundExpression(
-    [
-        COMPONENT_OPT_WHITESPACE,
-        COMPONENT_OPT_TYPE,
-        ExprComponent(SYMBOL_NAME, group_name=GROUP_SYMBOL_NAME),
-        COMPONENT_OPT_WHITESPACE,
-    ]
-)
-
-_FuncSomeArguments = CompoundExpression(
-    [
-        ExprComponent(L_PAREN),
-        ExprComponent(Repeated(_FuncArgumentNonLast, min_count=0), group_name="non_last_arguments"),
-        ExprComponent(_FuncArgumentLast, group_name="last_argument"),
-        ExprComponent(R_PAREN),
-    ]
-)
-
-_FuncNoArguments = CompoundExpression(
+_FuncArguments = CompoundExpression(
     [
         ExprComponent(L_PAREN),
+        ExprComponent(Repeated(_FuncArgument, min_count=0), group_name="argument_list"),
         COMPONENT_OPT_WHITESPACE,
         ExprComponent(R_PAREN),
     ]
-)
-
-_FuncArguments = UnionExpression([_FuncSomeArguments, _FuncNoArguments])
+).with_name("arguments")
 
 PromptedFunctionDeclaration = CompoundExpression(
     [
@@ -236,16 +189,10 @@ def extract_function_arguments(match: MatchResult) -> list[tuple[str, Optional[s
     Return a list of tuples of the argument name and the type name, or `None` if no type.
     """
 
-    arguments = []
-
-    if non_last_arguments_match := match.get_named_group_optional("non_last_arguments"):
-        for argument_match in non_last_arguments_match.indexed_groups:
-            arguments.append(extract_symbol_decl_info(argument_match))
-
-    if last_argument_match := match.get_named_group("last_argument"):
-        arguments.append(extract_symbol_decl_info(last_argument_match))
-
-    return arguments
+    return [
+        extract_symbol_decl_info(argument_match)
+        for argument_match in match.get_named_group("argument_list").indexed_groups
+    ]
 
 
 def extract_symbol_decl_info(match: MatchResult) -> tuple[str, Optional[str]]:
@@ -270,22 +217,13 @@ def extract_symbol_decl_info(match: MatchResult) -> tuple[str, Optional[str]]:
 def get_parameter_names(parameter_match: MatchResult) -> list[str]:
     """
     Extract the symbol names from the given parameter match, as returned from
-    `UnionExpression([_AIGenerativeParametersMultiple, _AIGenerativeParametersSingle])`.
+    `_AIGenerativeParameters`.
     """
 
-    last_symbol_name = (
-        parameter_match.get_named_group("last_parameter")
-        .get_named_group("symbol_name")
-        .matched_string
-    )
-
-    non_last_symbol_names: list[str] = []
-
-    if non_last := parameter_match.get_named_group_optional("non_last_parameters"):
-        for param in non_last.indexed_groups:
-            non_last_symbol_names.append(param.get_named_group("symbol_name").matched_string)
-
-    return non_last_symbol_names + [last_symbol_name]
+    return [
+        param.named_groups[GROUP_SYMBOL_NAME].matched_string
+        for param in parameter_match.get_named_group("parameter_list").indexed_groups
+    ]
 
 
 def extract_prompt(match: MatchResult) -> PromptData:
@@ -5,21 +5,28 @@ import json
 
 
 def read_file(path: str) -> str:
-    """Return the contents of a file as a string"""
-    with open(path) as fl:
+    """Return the contents of a UTF-8 encoded file as a string"""
+
+    with open(path, encoding="utf-8") as fl:
         return fl.read()
 
 
-def write_file(path: str, data: Union[str, bytes]) -> None:
+def _make_parent_directories(path: str) -> None:
+    """Create the parent directories of the given path, if there are any and they do not exist"""
+
+    if directory := os.path.dirname(path):
+        os.makedirs(directory, exist_ok=True)
+
+
+def write_file(path: str, data: Union[str, bytes, bytearray, memoryview]) -> None:
     """
     Write data to a file, creating it and its parent directories if necessary.
     Overrite the file if it already exists.
     """
 
-    if not os.path.exists(os.path.dirname(path)) and os.path.dirname(path) != "":
-        os.makedirs(os.path.dirname(path))
+    _make_parent_directories(path)
 
-    is_bytes = isinstance(data, bytes)
+    is_bytes = isinstance(data, (bytes, bytearray, memoryview))
 
     with open(path, "wb" if is_bytes else "w") as fl:
         fl.write(data)
@@ -31,25 +38,28 @@ def write_json(path: str, data: Any) -> None:
     Overrite the file if it already exists.
     """
 
-    write_file(path, data=json.dumps(data))
+    _make_parent_directories(path)
+
+    # serialize straight into the file rather than building the whole string first
+    with open(path, "w") as fl:
+        json.dump(data, fl, separators=(",", ":"))
 
 
 def _is_line_empty(line: str) -> bool:
     """Return true if the given string is empty or only whitespace"""
 
-    return len(line.strip()) == 0
+    return not line or line.isspace()
 
 
 def read_file_as_lines(path: str, remove_blank_lines: bool = False) -> list[str]:
     """Return the contents of the files as a list of lines"""
-    
-    data = read_file(path)
-    lines = data.split("\n")
 
     if not remove_blank_lines:
-        return lines
+        return read_file(path).split("\n")
 
-    return [line for line in lines if not _is_line_empty(line)]
+    # read line by line, so that the whole file is never held in memory alongside its lines
+    with open(path, encoding="utf-8") as fl:
+        return [line.rstrip("\n") for line in fl if not _is_line_empty(line)]
 
 
 def remove_path(path: str, ignore_if_missing: bool = False) -> None:
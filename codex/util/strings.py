@@ -1,23 +1,46 @@
+from typing import Optional
+
+
 class StringBuilder:
-    _data: str
+    _chunks: list[str]
+    """
+    Strings written since the contents were last joined, preceded by the previously joined
+    contents, if any.
+    """
+
+    _cached: Optional[str]
+    """
+    The joined contents, or `None` if something has been written since they were last joined.
+    """
 
     def __init__(self) -> None:
-        self._data = ""
+        self._chunks = []
+        self._cached = ""
 
     def write(self, data: str) -> None:
-        self._data += data
+        self._chunks.append(data)
+        self._cached = None
 
     def writeln(self, data="") -> None:
-        self.write(data + "\n")
+        self._chunks.append(data)
+        self._chunks.append("\n")
+        self._cached = None
 
     def to_string(self, trim_trailing_whitespace=False) -> str:
+        if self._cached is None:
+            self._cached = "".join(self._chunks)
+
+            # collapse the chunks so that future joins only copy new chunks onto the result
+            self._chunks = [self._cached]
+
         if trim_trailing_whitespace:
-            return self._data.rstrip()
+            return self._cached.rstrip()
         else:
-            return self._data
+            return self._cached
 
     def clear(self) -> None:
-        self._data = ""
+        self._chunks = []
+        self._cached = ""
 
 
 def indented(code: str, indentation_spaces: int = 4) -> str:
@@ -30,4 +53,6 @@ def indented(code: str, indentation_spaces: int = 4) -> str:
     ```
     """
 
-    return "\n".join(" " * indentation_spaces + line for line in code.split("\n"))
+    indentation = " " * indentation_spaces
+
+    return indentation + code.replace("\n", "\n" + indentation)
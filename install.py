@@ -11,11 +11,11 @@ def error(message: str) -> None:
 # check for the codex/ module directory
 module_directory = os.path.join(enclosing_directory, "codex")
 
-if not os.path.exists(module_directory):
+if not os.path.isdir(module_directory):
     error("Codex module not found. Please run this script from the codex directory.")
 
 # verify that this script is being run on Unix
-if platform.system() != "Linux" and platform.system() != "Darwin":
+if platform.system() not in ("Linux", "Darwin"):
     error("This script is currently only supported on Mac and Linux.")
 
 # verify that this script is being run with admin privileges
@@ -33,9 +33,11 @@ run_cli()
 
 # # create /usr/local/bin/codex
 BIN_PATH = "/usr/local/bin/codex"
-with open(BIN_PATH, "w") as f:
-    f.write(out)
+fd = os.open(BIN_PATH, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o755)
 
-# make executable
-os.chmod(BIN_PATH, 0o755)
+# the file object takes ownership of the descriptor, and writes the launcher in full
+with os.fdopen(fd, "w") as f:
+    # make executable, in case the file already existed with other permissions
+    os.fchmod(fd, 0o755)
+    f.write(out)
 